@@ -0,0 +1,71 @@
+import chess
+
+
+def pawn_attacks(pawns, color):
+    if color == chess.WHITE:
+        return (((pawns & ~chess.BB_FILE_A) << 7) | ((pawns & ~chess.BB_FILE_H) << 9)) & chess.BB_ALL
+    return ((pawns & ~chess.BB_FILE_A) >> 9) | ((pawns & ~chess.BB_FILE_H) >> 7)
+
+
+def attack_maps(board, color):
+    """
+    Squares attacked by the pieces of color, built in one pass from the precomputed attack tables.
+
+    Returns a list indexed by piece type, index 0 holds the union of all of them.
+    """
+    occupied = board.occupied
+    pieces = board.occupied_co[color]
+    maps = [0] * 7
+
+    maps[chess.PAWN] = pawn_attacks(board.pawns & pieces, color)
+
+    attacks = 0
+    for square in chess.scan_forward(board.knights & pieces):
+        attacks |= chess.BB_KNIGHT_ATTACKS[square]
+    maps[chess.KNIGHT] = attacks
+
+    attacks = 0
+    for square in chess.scan_forward(board.bishops & pieces):
+        attacks |= chess.BB_DIAG_ATTACKS[square][chess.BB_DIAG_MASKS[square] & occupied]
+    maps[chess.BISHOP] = attacks
+
+    attacks = 0
+    for square in chess.scan_forward(board.rooks & pieces):
+        attacks |= (chess.BB_RANK_ATTACKS[square][chess.BB_RANK_MASKS[square] & occupied]
+                    | chess.BB_FILE_ATTACKS[square][chess.BB_FILE_MASKS[square] & occupied])
+    maps[chess.ROOK] = attacks
+
+    attacks = 0
+    for square in chess.scan_forward(board.queens & pieces):
+        attacks |= (chess.BB_DIAG_ATTACKS[square][chess.BB_DIAG_MASKS[square] & occupied]
+                    | chess.BB_RANK_ATTACKS[square][chess.BB_RANK_MASKS[square] & occupied]
+                    | chess.BB_FILE_ATTACKS[square][chess.BB_FILE_MASKS[square] & occupied])
+    maps[chess.QUEEN] = attacks
+
+    king = board.king(color)
+    maps[chess.KING] = chess.BB_KING_ATTACKS[king] if king is not None else 0
+
+    maps[0] = (maps[chess.PAWN] | maps[chess.KNIGHT] | maps[chess.BISHOP]
+               | maps[chess.ROOK] | maps[chess.QUEEN] | maps[chess.KING])
+    return maps
+
+
+def space_control(own_maps, their_maps):
+    """
+    Number of squares attacked by one side minus the number attacked by the other
+    """
+    return chess.popcount(own_maps[0]) - chess.popcount(their_maps[0])
+
+
+def threatened_pieces(board, color, own_maps, their_maps):
+    """
+    Bitboard of the pieces of color (other than the king) that are attacked and either
+    undefended or attacked by a less valuable piece
+    """
+    pieces = board.occupied_co[color] & ~board.kings
+    minors = their_maps[chess.PAWN] | their_maps[chess.KNIGHT] | their_maps[chess.BISHOP]
+
+    return ((pieces & their_maps[0] & ~own_maps[0])
+            | ((board.knights | board.bishops | board.rooks | board.queens) & pieces & their_maps[chess.PAWN])
+            | ((board.rooks | board.queens) & pieces & minors)
+            | (board.queens & pieces & (minors | their_maps[chess.ROOK])))
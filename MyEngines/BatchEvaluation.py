@@ -0,0 +1,100 @@
+import chess
+import numpy as np
+
+from MyEngines.SearchBoard import MATERIAL_BY_PIECE, PIECE_SQUARE, piece_index
+
+# Material plus piece-square weights, signed from white's point of view
+MATERIAL_PST_WEIGHTS = np.array([[MATERIAL_BY_PIECE[index] + PIECE_SQUARE[index][square] for square in chess.SQUARES]
+                                 for index in range(12)], dtype=np.int32)
+
+
+def piece_weights(values):
+    """
+    Build a (12, 64) weight array from a {piece_type: value} dict, signed from white's point of view
+    """
+    weights = np.zeros((12, 64), dtype=np.float64)
+    for piece_type, value in values.items():
+        weights[piece_index(piece_type, chess.WHITE)] = value
+        weights[piece_index(piece_type, chess.BLACK)] = -value
+    return weights
+
+
+def placements(board):
+    """
+    Piece placement of board as a (12, 64) array of zeros and ones, one plane per piece_index
+    """
+    bitboards = np.zeros(12, dtype="<u8")
+    for piece_type, pieces in ((chess.PAWN, board.pawns), (chess.KNIGHT, board.knights),
+                               (chess.BISHOP, board.bishops), (chess.ROOK, board.rooks),
+                               (chess.QUEEN, board.queens), (chess.KING, board.kings)):
+        for color in chess.COLORS:
+            bitboards[piece_index(piece_type, color)] = pieces & board.occupied_co[color]
+    return np.unpackbits(bitboards.view(np.uint8), bitorder="little").reshape(12, 64)
+
+
+def child_placements(board, moves):
+    """
+    Piece placements after each of moves as a stacked (len(moves), 12, 64) array, without making the moves
+    """
+    children = np.repeat(placements(board)[np.newaxis], len(moves), axis=0)
+    turn = board.turn
+
+    cleared = ([], [], [])
+    placed = ([], [], [])
+
+    def clear(child, index, square):
+        cleared[0].append(child)
+        cleared[1].append(index)
+        cleared[2].append(square)
+
+    def place(child, index, square):
+        placed[0].append(child)
+        placed[1].append(index)
+        placed[2].append(square)
+
+    for child, move in enumerate(moves):
+        move = board._to_chess960(move)
+        from_square = move.from_square
+        to_square = move.to_square
+        piece_type = board.piece_type_at(from_square)
+        moving = piece_index(piece_type, turn)
+
+        clear(child, moving, from_square)
+
+        if piece_type == chess.KING and board.occupied_co[turn] & chess.BB_SQUARES[to_square]:
+            # castling, encoded as the king taking its own rook
+            a_side = chess.square_file(to_square) < chess.square_file(from_square)
+            rank = chess.square_rank(from_square)
+            rook = piece_index(chess.ROOK, turn)
+            clear(child, rook, to_square)
+            place(child, moving, chess.square(2 if a_side else 6, rank))
+            place(child, rook, chess.square(3 if a_side else 5, rank))
+            continue
+
+        captured_type = board.piece_type_at(to_square)
+        capture_square = to_square
+        if captured_type is None and piece_type == chess.PAWN and board.is_en_passant(move):
+            captured_type = chess.PAWN
+            capture_square = to_square - 8 if turn == chess.WHITE else to_square + 8
+        if captured_type is not None:
+            clear(child, piece_index(captured_type, not turn), capture_square)
+
+        place(child, piece_index(move.promotion, turn) if move.promotion else moving, to_square)
+
+    # clear before placing, a piece can land on the square of the piece it captures
+    children[cleared] = 0
+    children[placed] = 1
+    return children
+
+
+def evaluate_children(board, moves, weights=MATERIAL_PST_WEIGHTS):
+    """
+    Score the position after each of moves with one vectorized call.
+
+    weights is a (12, 64) array signed from white's point of view, the
+    scores are returned from the point of view of the side making the moves.
+    """
+    if not moves:
+        return np.zeros(0, dtype=weights.dtype)
+    scores = child_placements(board, moves).reshape(len(moves), 768) @ weights.reshape(768)
+    return scores if board.turn == chess.WHITE else -scores
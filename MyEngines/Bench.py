@@ -0,0 +1,234 @@
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+
+import chess
+import chess.pgn
+
+from MyEngines.ScoreEngine import ScoreEngine
+from MyEngines.SearchBoard import SearchBoard
+from MyEngines.SearchClock import SearchClock
+
+DEFAULT_PGN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "PGN", "Kasparov.pgn")
+DEFAULT_DEPTH = 4
+DEFAULT_NODES = 20000
+DEFAULT_GAMES = 8
+# Ply of each game the position is taken from
+GAME_PLY = 24
+DEFAULT_TOLERANCE = 0.1
+
+# (name, fen) of the tactical and endgame positions that are always benched
+BENCH_POSITIONS = [
+    ("wac001", "2rr3k/pp3pp1/1nnqbN1p/3pN3/2pP4/2P3Q1/PP3PPP/R4RK1 w - - 0 1"),
+    ("wac002", "8/7p/5k2/5p2/p1p2P2/Pr1pPK2/1P1R3P/8 b - - 0 1"),
+    ("kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"),
+    ("scholar", "r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4"),
+    ("back-rank", "6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1"),
+    ("fine70", "8/k7/3p4/p2P1p2/P2P1P2/8/8/K7 w - - 0 1"),
+    ("lucena", "1K1k4/1P6/8/8/8/8/r7/2R5 w - - 0 1"),
+    ("kqk", "8/8/8/3k4/8/8/8/3QK3 w - - 0 1"),
+    ("pawn-race", "8/8/1p6/8/8/6P1/8/k6K w - - 0 1"),
+]
+
+
+def game_positions(pgn_path, games=DEFAULT_GAMES, ply=GAME_PLY):
+    """
+    (name, fen) of the position at ply of games games spread evenly over the PGN file, read as Latin-1 like
+    the PGN files book_compiler.py reads
+    """
+    with open(pgn_path, encoding="latin-1") as pgn:
+        offsets = []
+        while True:
+            offset = pgn.tell()
+            if chess.pgn.read_headers(pgn) is None:
+                break
+            offsets.append(offset)
+
+        positions = []
+        step = max(len(offsets) // games, 1)
+        for index in range(0, len(offsets), step)[:games]:
+            pgn.seek(offsets[index])
+            game = chess.pgn.read_game(pgn)
+            board = game.board()
+            for move in list(game.mainline_moves())[:ply]:
+                board.push(move)
+            if not board.is_game_over():
+                positions.append(("{}-{}".format(os.path.splitext(os.path.basename(pgn_path))[0], index), board.fen()))
+        return positions
+
+
+def bench_search(engine, fen, depth=None, nodes=None):
+    """
+    Search fen with a cleared table to a fixed depth or node budget, returns the result as a dict
+    """
+    engine.new_game()
+    engine.clock = SearchClock(None, max_nodes=nodes)
+    search_board = SearchBoard(fen)
+
+    start = time.perf_counter()
+    # the search reports every iteration with print
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        best_move, _ = engine.search(search_board, depth)
+    seconds = time.perf_counter() - start
+
+    stats = engine.stats
+    return {
+        "move": search_board.uci(best_move),
+        "depth": stats.depth,
+        "nodes": stats.total_nodes,
+        "time": seconds,
+        "nps": int(stats.total_nodes / max(seconds, 1e-6)),
+        "tt_hit_rate": stats.tt_hits / stats.tt_probes if stats.tt_probes else 0,
+        "time_to_depth": {str(depth): seconds for depth, _, seconds in stats.iterations},
+    }
+
+
+def bench_one_ply(fen):
+    """
+    The one ply engines/ScoreEngine.py: score every legal move of fen, depth and budgets don't apply to it
+    """
+    # imported here, engines.ScoreEngine pulls in the whole bot through strategies
+    from engines.ScoreEngine import score_moves
+
+    board = chess.Board(fen)
+    moves = list(board.legal_moves)
+
+    start = time.perf_counter()
+    scored_moves = score_moves(board, moves)
+    seconds = time.perf_counter() - start
+
+    _, best_move = max(scored_moves, key=lambda scored_move: scored_move[0])
+    return {
+        "move": best_move.uci(),
+        "depth": 1,
+        "nodes": len(moves),
+        "time": seconds,
+        "nps": int(len(moves) / max(seconds, 1e-6)),
+        "tt_hit_rate": None,
+        "time_to_depth": {"1": seconds},
+    }
+
+
+def run(positions, engine_name="MyEngines", depth=DEFAULT_DEPTH, nodes=DEFAULT_NODES, hash_size=None,
+        output=sys.stdout):
+    """
+    Bench every position at the fixed depth and at the node budget, returns the report as a dict
+    """
+    limits = []
+    if depth:
+        limits.append(("depth", {"depth": depth}))
+    if nodes:
+        limits.append(("nodes", {"nodes": nodes}))
+
+    if engine_name == "MyEngines":
+        engine = ScoreEngine() if hash_size is None else ScoreEngine(hash_size=hash_size)
+    else:
+        engine = None
+        limits = [("ply", {})]
+
+    results = []
+    try:
+        for name, fen in positions:
+            for mode, limit in limits:
+                result = bench_search(engine, fen, **limit) if engine else bench_one_ply(fen)
+                result.update(name=name, fen=fen, mode=mode)
+                results.append(result)
+                print("{:<16} [{}] depth {:>2} nodes {:>8} time {:>7.3f} nps {:>7} tthits {} move {}".format(
+                    name, mode, result["depth"], result["nodes"], result["time"], result["nps"],
+                    "-" if result["tt_hit_rate"] is None else "{:.1%}".format(result["tt_hit_rate"]),
+                    result["move"]), file=output)
+    finally:
+        if engine:
+            engine.quit()
+
+    total_nodes = sum(result["nodes"] for result in results)
+    total_time = sum(result["time"] for result in results)
+    report = {
+        "engine": engine_name,
+        "depth": depth,
+        "max_nodes": nodes,
+        "results": results,
+        "total": {"nodes": total_nodes, "time": total_time, "nps": int(total_nodes / max(total_time, 1e-6))},
+    }
+    print("total nodes {} in {:.2f} s, {} nps".format(total_nodes, total_time, report["total"]["nps"]), file=output)
+    return report
+
+
+def compare(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Differences between a report and a baseline report, returns (regressions, notes).
+    Lower total nps and more nodes to reach the same depth beyond tolerance are regressions,
+    a different move only a note.
+    """
+    regressions = []
+    notes = []
+
+    nps, baseline_nps = report["total"]["nps"], baseline["total"]["nps"]
+    if nps < baseline_nps * (1 - tolerance):
+        regressions.append("nps {} is {:.1%} below the baseline {}".format(nps, 1 - nps / baseline_nps, baseline_nps))
+    elif nps > baseline_nps * (1 + tolerance):
+        notes.append("nps {} is {:.1%} above the baseline {}".format(nps, nps / baseline_nps - 1, baseline_nps))
+
+    baseline_results = {(result["name"], result["mode"]): result for result in baseline["results"]}
+    for result in report["results"]:
+        key = (result["name"], result["mode"])
+        if key not in baseline_results:
+            continue
+        old = baseline_results[key]
+        label = "{} {}".format(*key)
+
+        if result["mode"] == "depth" and result["depth"] == old["depth"]:
+            if result["nodes"] > old["nodes"] * (1 + tolerance):
+                regressions.append("{}: {} nodes to depth {}, was {}".format(
+                    label, result["nodes"], result["depth"], old["nodes"]))
+            elif result["nodes"] < old["nodes"] * (1 - tolerance):
+                notes.append("{}: {} nodes to depth {}, was {}".format(
+                    label, result["nodes"], result["depth"], old["nodes"]))
+        elif result["mode"] == "nodes" and result["depth"] < old["depth"]:
+            notes.append("{}: depth {} on the node budget, was {}".format(label, result["depth"], old["depth"]))
+
+        if result["move"] != old["move"]:
+            notes.append("{}: plays {}, was {}".format(label, result["move"], old["move"]))
+
+    return regressions, notes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search a fixed set of positions and compare with a baseline.")
+    parser.add_argument("--engine", choices=["MyEngines", "engines"], default="MyEngines",
+                        help="MyEngines/ScoreEngine.py or the one ply engines/ScoreEngine.py.")
+    parser.add_argument("--depth", type=int, default=DEFAULT_DEPTH, help="Fixed depth, 0 to skip.")
+    parser.add_argument("--nodes", type=int, default=DEFAULT_NODES, help="Fixed node budget, 0 to skip.")
+    parser.add_argument("--hash", type=int, help="Transposition table size in MB.")
+    parser.add_argument("--pgn", default=DEFAULT_PGN, help="PGN file the game positions are taken from.")
+    parser.add_argument("--games", type=int, default=DEFAULT_GAMES, help="Number of positions taken from the PGN.")
+    parser.add_argument("--output", help="Write the report as JSON to this file.")
+    parser.add_argument("--baseline", help="JSON report to compare with.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Relative change allowed before it counts as a regression.")
+    args = parser.parse_args()
+
+    positions = BENCH_POSITIONS + (game_positions(args.pgn, args.games) if args.games else [])
+    report = run(positions, args.engine, args.depth, args.nodes, args.hash)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions, notes = compare(report, baseline, args.tolerance)
+        for note in notes:
+            print(note)
+        for regression in regressions:
+            print("REGRESSION {}".format(regression))
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
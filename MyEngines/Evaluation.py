@@ -0,0 +1,247 @@
+import chess
+
+# Middlegame and endgame scores are packed into one int as eg * 2**32 + mg, so one addition updates both
+SCORE_SHIFT = 32
+
+
+def pack(mg, eg):
+    return (eg << SCORE_SHIFT) + mg
+
+
+def unpack(score):
+    mg = ((score + (1 << (SCORE_SHIFT - 1))) & ((1 << SCORE_SHIFT) - 1)) - (1 << (SCORE_SHIFT - 1))
+    return mg, (score - mg) >> SCORE_SHIFT
+
+
+# Piece values and piece-square tables from PeSTO, white's point of view with rank 8 first
+MG_PIECE_VALUES = {chess.PAWN: 82, chess.KNIGHT: 337, chess.BISHOP: 365, chess.ROOK: 477, chess.QUEEN: 1025,
+                   chess.KING: 0}
+EG_PIECE_VALUES = {chess.PAWN: 94, chess.KNIGHT: 281, chess.BISHOP: 297, chess.ROOK: 512, chess.QUEEN: 936,
+                   chess.KING: 0}
+
+MG_PIECE_SQUARE_TABLES = {
+    chess.PAWN: [
+        0, 0, 0, 0, 0, 0, 0, 0,
+        98, 134, 61, 95, 68, 126, 34, -11,
+        -6, 7, 26, 31, 65, 56, 25, -20,
+        -14, 13, 6, 21, 23, 12, 17, -23,
+        -27, -2, -5, 12, 17, 6, 10, -25,
+        -26, -4, -4, -10, 3, 3, 33, -12,
+        -35, -1, -20, -23, -15, 24, 38, -22,
+        0, 0, 0, 0, 0, 0, 0, 0],
+    chess.KNIGHT: [
+        -167, -89, -34, -49, 61, -97, -15, -107,
+        -73, -41, 72, 36, 23, 62, 7, -17,
+        -47, 60, 37, 65, 84, 129, 73, 44,
+        -9, 17, 19, 53, 37, 69, 18, 22,
+        -13, 4, 16, 13, 28, 19, 21, -8,
+        -23, -9, 12, 10, 19, 17, 25, -16,
+        -29, -53, -12, -3, -1, 18, -14, -19,
+        -105, -21, -58, -33, -17, -28, -19, -23],
+    chess.BISHOP: [
+        -29, 4, -82, -37, -25, -42, 7, -8,
+        -26, 16, -18, -13, 30, 59, 18, -47,
+        -16, 37, 43, 40, 35, 50, 37, -2,
+        -4, 5, 19, 50, 37, 37, 7, -2,
+        -6, 13, 13, 26, 34, 12, 10, 4,
+        0, 15, 15, 15, 14, 27, 18, 10,
+        4, 15, 16, 0, 7, 21, 33, 1,
+        -33, -3, -14, -21, -13, -12, -39, -21],
+    chess.ROOK: [
+        32, 42, 32, 51, 63, 9, 31, 43,
+        27, 32, 58, 62, 80, 67, 26, 44,
+        -5, 19, 26, 36, 17, 45, 61, 16,
+        -24, -11, 7, 26, 24, 35, -8, -20,
+        -36, -26, -12, -1, 9, -7, 6, -23,
+        -45, -25, -16, -17, 3, 0, -5, -33,
+        -44, -16, -20, -9, -1, 11, -6, -71,
+        -19, -13, 1, 17, 16, 7, -37, -26],
+    chess.QUEEN: [
+        -28, 0, 29, 12, 59, 44, 43, 45,
+        -24, -39, -5, 1, -16, 57, 28, 54,
+        -13, -17, 7, 8, 29, 56, 47, 57,
+        -27, -27, -16, -16, -1, 17, -2, 1,
+        -9, -26, -9, -10, -2, -4, 3, -3,
+        -14, 2, -11, -2, -5, 2, 14, 5,
+        -35, -8, 11, 2, 8, 15, -3, 1,
+        -1, -18, -9, 10, -15, -25, -31, -50],
+    chess.KING: [
+        -65, 23, 16, -15, -56, -34, 2, 13,
+        29, -1, -20, -7, -8, -4, -38, -29,
+        -9, 24, 2, -16, -20, 6, 22, -22,
+        -17, -20, -12, -27, -30, -25, -14, -36,
+        -49, -1, -27, -39, -46, -44, -33, -51,
+        -14, -14, -22, -46, -44, -30, -15, -27,
+        1, 7, -8, -64, -43, -16, 9, 8,
+        -15, 36, 12, -54, 8, -28, 24, 14]
+}
+
+EG_PIECE_SQUARE_TABLES = {
+    chess.PAWN: [
+        0, 0, 0, 0, 0, 0, 0, 0,
+        178, 173, 158, 134, 147, 132, 165, 187,
+        94, 100, 85, 67, 56, 53, 82, 84,
+        32, 24, 13, 5, -2, 4, 17, 17,
+        13, 9, -3, -7, -7, -8, 3, -1,
+        4, 7, -6, 1, 0, -5, -1, -8,
+        13, 8, 8, 10, 13, 0, 2, -7,
+        0, 0, 0, 0, 0, 0, 0, 0],
+    chess.KNIGHT: [
+        -58, -38, -13, -28, -31, -27, -63, -99,
+        -25, -8, -25, -2, -9, -25, -24, -52,
+        -24, -20, 10, 9, -1, -9, -19, -41,
+        -17, 3, 22, 22, 22, 11, 8, -18,
+        -18, -6, 16, 25, 16, 17, 4, -18,
+        -23, -3, -1, 15, 10, -3, -20, -22,
+        -42, -20, -10, -5, -2, -20, -23, -44,
+        -29, -51, -23, -15, -22, -18, -50, -64],
+    chess.BISHOP: [
+        -14, -21, -11, -8, -7, -9, -17, -24,
+        -8, -4, 7, -12, -3, -13, -4, -14,
+        2, -8, 0, -1, -2, 6, 0, 4,
+        -3, 9, 12, 9, 14, 10, 3, 2,
+        -6, 3, 13, 19, 7, 10, -3, -9,
+        -12, -3, 8, 10, 13, 3, -7, -15,
+        -14, -18, -7, -1, 4, -9, -15, -27,
+        -23, -9, -23, -5, -9, -16, -5, -17],
+    chess.ROOK: [
+        13, 10, 18, 15, 12, 12, 8, 5,
+        11, 13, 13, 11, -3, 3, 8, 3,
+        7, 7, 7, 5, 4, -3, -5, -3,
+        4, 3, 13, 1, 2, 1, -1, 2,
+        3, 5, 8, 4, -5, -6, -8, -11,
+        -4, 0, -5, -1, -7, -12, -8, -16,
+        -6, -6, 0, 2, -9, -9, -11, -3,
+        -9, 2, 3, -1, -5, -13, 4, -20],
+    chess.QUEEN: [
+        -9, 22, 22, 27, 27, 19, 10, 20,
+        -17, 20, 32, 41, 58, 25, 30, 0,
+        -20, 6, 9, 49, 47, 35, 19, 9,
+        3, 22, 24, 45, 57, 40, 57, 36,
+        -18, 28, 19, 47, 31, 34, 39, 23,
+        -16, -27, 15, 6, 9, 17, 10, 5,
+        -22, -23, -30, -16, -16, -23, -36, -32,
+        -33, -28, -22, -43, -5, -32, -20, -41],
+    chess.KING: [
+        -74, -35, -18, -18, -11, 15, 4, -17,
+        -12, 17, 14, 17, 17, 38, 23, 11,
+        10, 17, 23, 15, 20, 45, 44, 13,
+        -8, 22, 24, 27, 26, 33, 26, 3,
+        -18, -4, 21, 24, 27, 23, 9, -11,
+        -19, -3, 11, 21, 23, 16, 7, -9,
+        -27, -11, 4, 13, 14, 4, -5, -17,
+        -53, -34, -21, -11, -28, -14, -24, -43]
+}
+
+# Game phase: 24 with all minor and major pieces on the board, 0 with only kings and pawns
+PHASE_VALUES = {chess.PAWN: 0, chess.KNIGHT: 1, chess.BISHOP: 1, chess.ROOK: 2, chess.QUEEN: 4, chess.KING: 0}
+MAX_PHASE = 24
+
+# Structural terms as (mg, eg)
+BISHOP_PAIR = pack(30, 50)
+DOUBLED_PAWN = pack(-10, -20)
+ISOLATED_PAWN = pack(-10, -15)
+ROOK_OPEN_FILE = pack(25, 10)
+ROOK_SEMI_OPEN_FILE = pack(12, 5)
+# By rank counted from the pawn's own side
+PASSED_PAWN = [pack(mg, eg) for mg, eg in [(0, 0), (5, 10), (5, 15), (10, 25), (20, 45), (35, 75), (60, 120), (0, 0)]]
+
+# Pawn structure scores by (white pawns, black pawns), cleared once it holds this many
+PAWN_CACHE_SIZE = 1 << 16
+
+# Flat lookups indexed like SearchBoard.piece_index, (piece_type - 1) * 2 + color, signed from white's point of view
+TAPERED_PIECE_SQUARE = [[0] * 64 for _ in range(12)]
+PHASE_BY_PIECE = [0] * 12
+
+for _piece_type in chess.PIECE_TYPES:
+    for _color in chess.COLORS:
+        _index = (_piece_type - 1) * 2 + _color
+        _sign = 1 if _color == chess.WHITE else -1
+        PHASE_BY_PIECE[_index] = PHASE_VALUES[_piece_type]
+        for _square in chess.SQUARES:
+            _table_square = _square ^ 56 if _color == chess.WHITE else _square
+            TAPERED_PIECE_SQUARE[_index][_square] = _sign * pack(
+                MG_PIECE_VALUES[_piece_type] + MG_PIECE_SQUARE_TABLES[_piece_type][_table_square],
+                EG_PIECE_VALUES[_piece_type] + EG_PIECE_SQUARE_TABLES[_piece_type][_table_square])
+
+# Files next to each file, and the squares in front of a square on its own and the neighbouring files
+ADJACENT_FILES = [(chess.BB_FILES[file - 1] if file > 0 else 0) | (chess.BB_FILES[file + 1] if file < 7 else 0)
+                  for file in range(8)]
+PASSED_PAWN_MASKS = [[0] * 64 for _ in chess.COLORS]
+
+for _square in chess.SQUARES:
+    _file = chess.square_file(_square)
+    _rank = chess.square_rank(_square)
+    _files = chess.BB_FILES[_file] | ADJACENT_FILES[_file]
+    PASSED_PAWN_MASKS[chess.WHITE][_square] = _files & (chess.BB_ALL << (8 * (_rank + 1)))
+    PASSED_PAWN_MASKS[chess.BLACK][_square] = _files & ((1 << (8 * _rank)) - 1)
+
+pawn_cache = {}
+
+
+def pawn_structure(white_pawns, black_pawns):
+    """
+    Packed score of the doubled, isolated and passed pawns, from white's point of view
+    """
+    key = (white_pawns, black_pawns)
+    score = pawn_cache.get(key)
+    if score is not None:
+        return score
+
+    score = 0
+    for color, pawns, their_pawns, sign in ((chess.WHITE, white_pawns, black_pawns, 1),
+                                            (chess.BLACK, black_pawns, white_pawns, -1)):
+        for file in range(8):
+            on_file = chess.popcount(pawns & chess.BB_FILES[file])
+            if on_file:
+                if on_file > 1:
+                    score += sign * (on_file - 1) * DOUBLED_PAWN
+                if not pawns & ADJACENT_FILES[file]:
+                    score += sign * on_file * ISOLATED_PAWN
+
+        for square in chess.scan_forward(pawns):
+            if not their_pawns & PASSED_PAWN_MASKS[color][square]:
+                rank = chess.square_rank(square)
+                score += sign * PASSED_PAWN[rank if color == chess.WHITE else 7 - rank]
+
+    if len(pawn_cache) >= PAWN_CACHE_SIZE:
+        pawn_cache.clear()
+    pawn_cache[key] = score
+    return score
+
+
+def piece_terms(board):
+    """
+    Packed score of the bishop pair and rooks on open files, from white's point of view
+    """
+    score = 0
+    pawns = board.pawns
+    for color, sign in ((chess.WHITE, 1), (chess.BLACK, -1)):
+        pieces = board.occupied_co[color]
+        if chess.popcount(board.bishops & pieces) >= 2:
+            score += sign * BISHOP_PAIR
+        for square in chess.scan_forward(board.rooks & pieces):
+            file = chess.BB_FILES[chess.square_file(square)]
+            if not pawns & file:
+                score += sign * ROOK_OPEN_FILE
+            elif not pawns & pieces & file:
+                score += sign * ROOK_SEMI_OPEN_FILE
+    return score
+
+
+def evaluate(board):
+    """
+    Tapered evaluation of a SearchBoard for the side to move.
+
+    The piece-square part comes from the board's incrementally updated
+    `tapered` and `phase` accumulators, only the structural terms are
+    computed here, and the pawn structure mostly comes from the cache.
+    """
+    white_pawns = board.pawns & board.occupied_co[chess.WHITE]
+    score = board.tapered + pawn_structure(white_pawns, board.pawns & ~white_pawns) + piece_terms(board)
+
+    mg, eg = unpack(score)
+    phase = min(board.phase, MAX_PHASE)
+    score = mg * phase + eg * (MAX_PHASE - phase)
+    # turn the sign before dividing, so both sides round the same way
+    return (score if board.turn == chess.WHITE else -score) // MAX_PHASE
@@ -0,0 +1,100 @@
+import multiprocessing
+import os
+import sys
+
+import chess
+
+from MyEngines.TranspositionTable import shared_memory
+
+
+def helper_main(index, queue, search_id, table_name, hash_size, max_depth, pruning):
+    """
+    Helper process: search every position it is sent until the main process moves on to another search
+    """
+    # imported here, ScoreEngine imports this module
+    from MyEngines.ScoreEngine import ScoreEngine
+    from MyEngines.SearchBoard import SearchBoard
+    from MyEngines.SearchClock import SearchClock
+    from MyEngines.SearchStats import SearchStats
+
+    # the progress prints of the helpers would only interleave with the main search
+    sys.stdout = open(os.devnull, "w")
+
+    engine = ScoreEngine(max_depth=max_depth, hash_size=hash_size, shared_table=table_name, pruning=pruning)
+
+    while True:
+        task = queue.get()
+        if task is None:
+            break
+
+        task_id, root_fen, moves, chess960, generation = task
+        if search_id.value != task_id:
+            # the search ended before this helper got to it
+            continue
+
+        board = SearchBoard(root_fen, chess960=chess960)
+        for move in moves:
+            board.push(chess.Move.from_uci(move))
+
+        engine.transposition_table.generation = generation
+        engine.move_orderer.new_search()
+        engine.stats = SearchStats()
+        engine.clock = SearchClock(should_stop=lambda: search_id.value != task_id)
+        engine.helper_search(board, index)
+
+    engine.transposition_table.close()
+
+
+class HelperPool:
+    """
+    Helper processes for a lazy SMP search.
+
+    Every helper searches the same root as the main process, with a
+    different first depth and root move order, and all of them share one
+    transposition table. The helpers only make the table better, the move
+    is always chosen by the main process.
+    """
+
+    def __init__(self, count, table_name, hash_size, max_depth, pruning):
+        self.search_id = multiprocessing.Value("i", 0, lock=False)
+        self.queues = []
+        self.processes = []
+
+        for index in range(1, count + 1):
+            queue = multiprocessing.Queue()
+            process = multiprocessing.Process(target=helper_main,
+                                              args=(index, queue, self.search_id, table_name, hash_size, max_depth,
+                                                    pruning),
+                                              daemon=True)
+            process.start()
+            self.queues.append(queue)
+            self.processes.append(process)
+
+    @staticmethod
+    def can_start():
+        """
+        Daemonic processes, e.g. lichess-bot's game workers, are not allowed to start children,
+        and the helpers need a shared table, which Python 3.7 doesn't have
+        """
+        return shared_memory is not None and not multiprocessing.current_process().daemon
+
+    def start_search(self, board, generation):
+        self.search_id.value += 1
+        task = (self.search_id.value, board.root().fen(), [move.uci() for move in board.move_stack],
+                board.chess960, generation)
+        for queue in self.queues:
+            queue.put(task)
+
+    def stop_search(self):
+        self.search_id.value += 1
+
+    def close(self):
+        self.stop_search()
+        for queue in self.queues:
+            queue.put(None)
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.queues = []
+        self.processes = []
@@ -0,0 +1,122 @@
+import chess
+
+from MyEngines.StaticExchange import SEE_VALUES, see_ge
+
+MAX_PLY = 64
+
+# History scores are halved once any of them grows past this, so they stay small ints
+MAX_HISTORY = 1 << 24
+
+
+def mvv_lva(board, move):
+    """
+    Most valuable victim first, least valuable attacker second
+    """
+    victim = board.piece_type_at(move.to_square)
+    if victim is None:
+        # en passant
+        victim = chess.PAWN if board.is_en_passant(move) else 0
+    attacker = board.piece_type_at(move.from_square)
+    score = 8 * victim - attacker
+    if move.promotion:
+        score += 8 * move.promotion
+    return score
+
+
+class MoveOrderer:
+    """
+    Generates legal moves lazily in stages, so moves after a beta cutoff are never generated.
+
+    The hash move comes first, then captures and queen promotions that do
+    not lose material by MVV-LVA, then the two killer moves of the ply,
+    the quiet moves by their history score and finally the losing captures.
+    """
+
+    def __init__(self):
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        self.history = [[0] * 4096 for _ in chess.COLORS]
+
+    def new_search(self):
+        """
+        Forget the killers and age the history, called once per move searched
+        """
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        self.history = [[value // 2 for value in history] for history in self.history]
+
+    def staged_moves(self, board, hash_move=None, ply=0):
+        """
+        Yield the legal moves of board, best first. The board must be back in
+        the same position every time the next move is requested.
+        """
+        if hash_move and board.is_legal(hash_move):
+            yield hash_move
+
+        # Captures and queen promotions
+        promotion_rank = chess.BB_RANK_7 if board.turn == chess.WHITE else chess.BB_RANK_2
+        captures = list(board.generate_legal_captures())
+        captures += [move for move in board.generate_legal_moves(board.pawns & promotion_rank, ~board.occupied)
+                     if move.promotion == chess.QUEEN]
+        captures.sort(key=lambda move: mvv_lva(board, move), reverse=True)
+
+        bad_captures = []
+        for move in captures:
+            if move == hash_move:
+                continue
+            if self.is_winning_capture(board, move):
+                yield move
+            else:
+                bad_captures.append(move)
+
+        killers = []
+        for killer in (self.killers[ply] if ply < MAX_PLY else ()):
+            if (killer and killer != hash_move and killer not in killers
+                    and self.is_quiet(board, killer) and board.is_legal(killer)):
+                killers.append(killer)
+                yield killer
+
+        # Quiet moves, including castling and under-promotions
+        history = self.history[board.turn]
+        ep_square = board.ep_square
+        quiets = [move for move in board.generate_legal_moves(chess.BB_ALL, ~board.occupied_co[not board.turn])
+                  if move.promotion != chess.QUEEN
+                  and not (move.to_square == ep_square and board.is_en_passant(move))
+                  and move != hash_move and move not in killers]
+        quiets.sort(key=lambda move: history[move.from_square * 64 + move.to_square], reverse=True)
+        yield from quiets
+
+        yield from bad_captures
+
+    def is_winning_capture(self, board, move):
+        """
+        Captures of a piece worth at least the capturing piece are never losing, the rest go through SEE
+        """
+        victim = board.piece_type_at(move.to_square) or chess.PAWN
+        attacker = board.piece_type_at(move.from_square)
+        if not move.promotion and SEE_VALUES[victim] >= SEE_VALUES[attacker]:
+            return True
+        return see_ge(board, move, 0)
+
+    def is_quiet(self, board, move):
+        return not (move.promotion or board.is_capture(move))
+
+    def is_killer(self, move, ply):
+        return ply < MAX_PLY and move in self.killers[ply]
+
+    def history_score(self, board, move):
+        return self.history[board.turn][move.from_square * 64 + move.to_square]
+
+    def add_cutoff(self, board, move, depth, ply):
+        """
+        Remember a quiet move that caused a beta cutoff as a killer and in the history table
+        """
+        if ply < MAX_PLY:
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1] = killers[0]
+                killers[0] = move
+
+        history = self.history[board.turn]
+        index = move.from_square * 64 + move.to_square
+        history[index] += depth * depth
+        if history[index] > MAX_HISTORY:
+            self.history = [[value // 2 for value in history] for history in self.history]
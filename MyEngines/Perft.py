@@ -0,0 +1,125 @@
+import argparse
+import sys
+import time
+
+import chess
+
+from MyEngines.SearchBoard import SearchBoard
+
+# (name, fen, chess960, {depth: nodes}), node counts from the chessprogramming wiki perft results
+PERFT_POSITIONS = [
+    ("startpos", chess.STARTING_FEN, False,
+     {1: 20, 2: 400, 3: 8902, 4: 197281, 5: 4865609}),
+    ("kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", False,
+     {1: 48, 2: 2039, 3: 97862, 4: 4085603}),
+    ("endgame", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", False,
+     {1: 14, 2: 191, 3: 2812, 4: 43238, 5: 674624}),
+    ("promotions", "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", False,
+     {1: 6, 2: 264, 3: 9467, 4: 422333}),
+    ("castling", "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", False,
+     {1: 44, 2: 1486, 3: 62379, 4: 2103487}),
+    ("middlegame", "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10", False,
+     {1: 46, 2: 2079, 3: 89890, 4: 3894594}),
+    ("chess960-1", "bqnb1rkr/pp3ppp/3ppn2/2p5/5P2/P2P4/NPP1P1PP/BQ1BNRKR w HFhf - 2 9", True,
+     {1: 21, 2: 528, 3: 12189, 4: 326672}),
+    ("chess960-2", "2nnrbkr/p1qppppp/8/1ppb4/6PP/3PP3/PPP2P2/BQNNRBKR w HEhe - 1 9", True,
+     {1: 21, 2: 807, 3: 18002, 4: 667366}),
+]
+
+BOARDS = {
+    "python-chess": chess.Board,
+    "search": SearchBoard,
+}
+
+
+def perft(board, depth, bulk=True):
+    """
+    Number of leaf nodes of the legal move tree of board to depth.
+    With bulk the moves of the last ply are counted instead of made.
+    """
+    if depth == 0:
+        return 1
+    if bulk and depth == 1:
+        return board.legal_moves.count()
+
+    nodes = 0
+    for move in board.generate_legal_moves():
+        board.push(move)
+        nodes += perft(board, depth - 1, bulk)
+        board.pop()
+    return nodes
+
+
+def divide(board, depth, bulk=True):
+    """
+    Perft of the position after each legal move, to find the move a generator gets wrong
+    """
+    counts = {}
+    for move in board.generate_legal_moves():
+        board.push(move)
+        nodes = perft(board, depth - 1, bulk)
+        board.pop()
+        counts[board.uci(move)] = nodes
+    return counts
+
+
+def run(board_class, depth, bulk=True, names=None, output=sys.stdout):
+    """
+    Perft every position to depth with board_class, returns the positions whose counts are wrong
+    """
+    failures = []
+    total_nodes = 0
+    total_time = 0
+
+    for name, fen, chess960, expected in PERFT_POSITIONS:
+        if names and name not in names:
+            continue
+        position_depth = min(depth, max(expected))
+        board = board_class(fen, chess960=chess960)
+
+        start = time.perf_counter()
+        nodes = perft(board, position_depth, bulk)
+        seconds = time.perf_counter() - start
+        total_nodes += nodes
+        total_time += seconds
+
+        correct = nodes == expected[position_depth]
+        if not correct:
+            failures.append(name)
+        print("{:<12} depth {} nodes {:>10} {:>10.0f} nps {}".format(
+            name, position_depth, nodes, nodes / max(seconds, 1e-9),
+            "ok" if correct else "expected {}".format(expected[position_depth])), file=output)
+
+    print("total nodes {} in {:.2f} s, {:.0f} nps".format(total_nodes, total_time, total_nodes / max(total_time, 1e-9)),
+          file=output)
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count the legal move tree of standard positions.")
+    parser.add_argument("--depth", type=int, default=3, help="Depth to count to, capped by the known counts.")
+    parser.add_argument("--board", choices=list(BOARDS), default="search", help="Board implementation to test.")
+    parser.add_argument("--position", action="append", help="Only run the positions with these names.")
+    parser.add_argument("--no-bulk", action="store_true",
+                        help="Make the moves of the last ply instead of counting them.")
+    parser.add_argument("--divide", metavar="FEN", help="Print the perft of every move of this position.")
+    parser.add_argument("--chess960", action="store_true", help="The --divide position is a chess960 position.")
+    args = parser.parse_args()
+
+    board_class = BOARDS[args.board]
+    bulk = not args.no_bulk
+
+    if args.divide:
+        counts = divide(board_class(args.divide, chess960=args.chess960), args.depth, bulk)
+        for move, nodes in sorted(counts.items()):
+            print("{}: {}".format(move, nodes))
+        print("total {}".format(sum(counts.values())))
+        return
+
+    failures = run(board_class, args.depth, bulk, args.position)
+    if failures:
+        sys.exit("Wrong node counts for {}".format(", ".join(failures)))
+
+
+if __name__ == "__main__":
+    main()
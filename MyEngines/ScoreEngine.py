@@ -1,19 +1,20 @@
-from collections import namedtuple
 from math import inf as INFINITY
-import random
 
 import chess
-import dis
-import time
+import logging
+import threading
 
-PIECE_VALUES = {
-    chess.KING: 0,
-    chess.QUEEN: 900,
-    chess.ROOK: 500,
-    chess.BISHOP: 320,
-    chess.KNIGHT: 310,
-    chess.PAWN: 100
-}
+from MyEngines.SearchClock import SearchClock, SearchTimeout
+from MyEngines.SearchStats import SearchStats
+from MyEngines.AttackMaps import attack_maps, space_control
+from MyEngines.BatchEvaluation import evaluate_children
+from MyEngines.Evaluation import evaluate
+from MyEngines.LazySMP import HelperPool
+from MyEngines.MoveOrdering import MoveOrderer, mvv_lva, MAX_PLY
+from MyEngines.SearchBoard import SearchBoard, PIECE_VALUES
+from MyEngines.TranspositionTable import TranspositionTable, DEFAULT_HASH_MB, EXACT, LOWER_BOUND, UPPER_BOUND
+
+logger = logging.getLogger(__name__)
 
 
 def material_count(board):
@@ -33,165 +34,290 @@ def material_count(board):
 
 
 def improved_score(board):
+    """
+    Material and space score of any chess.Board for the side that just moved, no longer the default
+    evaluation but kept for scratch.ipynb and other callers that don't use a SearchBoard
+    """
     score = material_count(board)
 
     # Compute space controlled by current color
-    space = 0
-    for square in chess.SQUARES:
-        if board.is_attacked_by(board.turn, square):
-            space += 100
-        if board.is_attacked_by(not board.turn, square):
-            space -= 100
+    own_maps = attack_maps(board, board.turn)
+    their_maps = attack_maps(board, not board.turn)
+    space = 100 * space_control(own_maps, their_maps)
 
     score += space * 1 / 64
 
     return score
 
 
-num_pruned = 0
-cache_hits = 0
-positions = 0
-
-
-class ScoreEngine:
-
-    def __init__(self, max_depth=15):
-        self.max_depth = max_depth
-        self.name = "ScoreEngine"
-        self.known_positions = {}
-        self.visited_positions = set()
+def tapered_score(board):
+    """
+    Tapered middlegame/endgame evaluation of a SearchBoard for the side that just moved
+    """
+    return -evaluate(board)
 
-    def store_position(self, board):
-        key = board._transposition_key()
 
-        if key in self.visited_positions:
-            self.known_positions[key] = (0, INFINITY)
-        else:
-            self.visited_positions.add(key)
+ASPIRATION_WINDOW = 50
 
-    def cached_score_difference(self, board):
-        key = board._transposition_key()
+# Quiescence search limits
+MAX_QUIESCENCE_PLY = 8
+MATE_SCORE = 100000
+DELTA_MARGIN = 200
 
-        if key in self.known_positions:
-            score, _ = self.known_positions[key]
-            return score
-        return material_count(board)
+# Mates are scored MATE_SCORE - plies from the root, scores past this are mates and pruning is never based on them
+MATE_BOUND = MATE_SCORE - 1000
 
-    def get_all_moves(self, board, moves):
-        """
-        Return a scored list of moves to search over
-        """
-        children = []
+# Selective search, every technique can be switched off through the options of the same name
+PRUNING_OPTIONS = ["NullMove", "LateMoveReductions", "ReverseFutility", "Futility", "CheckExtensions"]
 
-        # generate children positions from legal moves
-        for move in moves:
-            board.push(move)  # apply the current candidate move
-            sort_score = self.cached_score_difference(board)
-            board.pop()  # undo the candidate move
+NULL_MOVE_MIN_DEPTH = 3
+NULL_MOVE_REDUCTION = 2
 
-            children.append((sort_score, move))
+LMR_MIN_DEPTH = 3
+LMR_MIN_MOVES = 3
+# Quiet moves with a history score above this are reduced one ply less
+LMR_GOOD_HISTORY = 64
 
-        return children
+REVERSE_FUTILITY_DEPTH = 3
+REVERSE_FUTILITY_MARGIN = 120
 
-    def loud_moves_only(self, board, moves):
-        """
-        Return a scored list of moves to search over
-        """
-        children = []
+# Indexed by the remaining depth
+FUTILITY_MARGINS = [0, 150, 300]
 
-        was_check = board.is_check()
 
-        # generate children positions from legal moves
-        for move in moves:
+def mate_distance(score):
+    """
+    Plies to the mate a search score stands for, None if it is not a mate score
+    """
+    if score is None or abs(score) == INFINITY or abs(score) <= MATE_BOUND:
+        return None
+    return MATE_SCORE - abs(score)
 
-            is_capture = board.is_capture(move)
 
-            # check if move is a capture or check
-            board.push(move)  # apply the current candidate move
+def score_to_table(score, ply):
+    """
+    Mate scores count plies from the root, the table keeps them counted from the node at ply,
+    so they stay right when the position is reached at another ply or in a later search
+    """
+    if score > MATE_BOUND:
+        return score + ply
+    if score < -MATE_BOUND:
+        return score - ply
+    return score
 
-            if was_check or board.is_check() or is_capture:
-                sort_score = self.cached_score_difference(board)
-                children.append((sort_score, move))
 
-            board.pop()  # undo the candidate move
+def score_from_table(score, ply):
+    if score > MATE_BOUND:
+        return score - ply
+    if score < -MATE_BOUND:
+        return score + ply
+    return score
 
-        # if children:
-        #     print(board.fen())
-        #     print("Found {} loud moves.".format(len(children)))
 
-        return children
+class ScoreEngine:
 
-    def quiescence_search(self, board):
-        key = board._transposition_key()
-        if key in self.known_positions:
-            score, _ = self.known_positions[key]
+    def __init__(self, max_depth=15, hash_size=DEFAULT_HASH_MB, threads=1, shared_table=None, pruning=None):
+        """
+        :param threads: Number of processes searching each move, the ones after the first are lazy SMP helpers
+        :param shared_table: Name of the shared transposition table to attach to, used by the helpers
+        :param pruning: {name: bool} for the PRUNING_OPTIONS to switch off, all of them are on by default
+        """
+        self.max_depth = max_depth
+        self.pruning = {name: True for name in PRUNING_OPTIONS}
+        self.pruning.update(pruning or {})
+        self.name = "ScoreEngine"
+        self.clock = SearchClock()
+        self.move_orderer = MoveOrderer()
+        self.helpers = None
+        # Statistics of the running search, and of the last one that chose a move
+        self.stats = SearchStats()
+        self.last_stats = self.stats
+        # Called with the stats after every finished iteration
+        self.on_iteration = None
+
+        # Background search of the position after the expected reply
+        self.ponder_thread = None
+        self.ponder_board = None
+        self.ponder_moves = None
+        self.ponder_result = None
+
+        if shared_table:
+            self.transposition_table = TranspositionTable(hash_size, name=shared_table)
+        elif threads > 1 and HelperPool.can_start():
+            self.transposition_table = TranspositionTable(hash_size, shared=True)
+            self.helpers = HelperPool(threads - 1, self.transposition_table.name, hash_size, max_depth, self.pruning)
         else:
-            print("quiesence_search")
-            score = self.minimax_score(board, current_depth=1, timelimit=time.time() + 1,
-                                       sorted_moves=self.loud_moves_only,
-                                       evaluation_function=self.cached_score_difference,
-                                       caching=False, early_stop=True, max_depth=self.max_depth)
-
-            self.known_positions[key] = (score, 0)
-        return score
+            if threads > 1:
+                logger.warning("{} threads were asked for, but the helper processes can't be started in a daemonic "
+                               "process or without shared memory (Python 3.7), searching in one thread. Run "
+                               "MyEngines/ScoreEngine as a UCI engine to use them.".format(threads))
+            self.transposition_table = TranspositionTable(hash_size)
 
-    def minimax_score(self, board, alpha=-INFINITY, beta=INFINITY, current_depth=0,
-                      max_depth=4, timelimit=None, sorted_moves=get_all_moves,
-                      evaluation_function=material_count, caching=True, early_stop=False):
+    def quiescence_search(self, board, alpha, beta, current_depth, evaluation_function=tapered_score, ply=0):
+        """
+        Search captures (and evasions when in check) until the position is quiet.
+        Returns the score for the side to move.
+        """
+        self.stats.qnodes += 1
+        self.clock.tick()
 
-        global cache_hits, num_pruned, positions
-        positions += 1
+        in_check = board.is_check()
 
-        outcome = board.outcome(claim_draw=False)
+        if in_check:
+            best_score = -INFINITY
+            moves = list(board.legal_moves)
+            if not moves:
+                return -(MATE_SCORE - current_depth)
+        else:
+            # Stand pat, the side to move does not have to capture
+            best_score = -evaluation_function(board)
+            if best_score >= beta or ply >= MAX_QUIESCENCE_PLY:
+                return best_score
+            # Not even winning a queen would bring the score back to alpha
+            if best_score + PIECE_VALUES[chess.QUEEN] + DELTA_MARGIN < alpha:
+                return best_score
+            alpha = max(alpha, best_score)
+
+            moves = list(board.generate_legal_captures())
+            promotion_rank = chess.BB_RANK_7 if board.turn == chess.WHITE else chess.BB_RANK_2
+            moves += [move for move in board.generate_legal_moves(board.pawns & promotion_rank, ~board.occupied)
+                      if move.promotion == chess.QUEEN]
+
+        for move in sorted(moves, key=lambda move: mvv_lva(board, move), reverse=True):
+            if not in_check and not move.promotion:
+                # Delta pruning: the capture cannot raise the score to alpha
+                victim = board.piece_type_at(move.to_square) or chess.PAWN
+                if best_score + PIECE_VALUES[victim] + DELTA_MARGIN < alpha:
+                    continue
+                # SEE pruning: skip captures that lose material
+                if not self.move_orderer.is_winning_capture(board, move):
+                    continue
 
-        turn = board.turn
+            board.push(move)
+            score = -self.quiescence_search(board, -beta, -alpha, current_depth + 1, evaluation_function, ply + 1)
+            board.pop()
 
-        if outcome:
-            if outcome.winner is None:
-                return 0
-            else:
-                return 100000 / current_depth  # prefer shallower checkmates
+            if score > best_score:
+                best_score = score
+                if score >= beta:
+                    return score
+                alpha = max(score, alpha)
 
-        if current_depth == max_depth:
-            return evaluation_function(board)
+        return best_score
 
-        # Make a list of all legal moves
-        moves = list(board.legal_moves)
+    def minimax_score(self, board, alpha=-INFINITY, beta=INFINITY, current_depth=0,
+                      max_depth=4, evaluation_function=tapered_score):
+
+        stats = self.stats
+        stats.nodes += 1
+        self.clock.tick()
+
+        # A repetition on the search path or of a game position is scored as a draw
+        if board.is_repeated():
+            return 0
+
+        # So is the fifty-move rule, unless the move that reached it gave checkmate
+        if board.halfmove_clock >= 100 and not (board.is_check() and board.is_checkmate()):
+            return 0
+
+        # Only positions without pawns, rooks and queens can lack mating material
+        if not (board.pawns | board.rooks | board.queens) and board.is_insufficient_material():
+            return 0
+
+        if current_depth >= max_depth:
+            return -self.quiescence_search(board, alpha, beta, current_depth, evaluation_function)
+
+        # Scores in the table are from the point of view of the side to move
+        key = board.zobrist_hash
+        depth = max_depth - current_depth
+        hash_move = None
+
+        stats.tt_probes += 1
+        entry = self.transposition_table.probe(key)
+        if entry:
+            stats.tt_hits += 1
+            hash_move = entry.move
+            score = score_from_table(entry.score, current_depth)
+            if entry.depth >= depth and (entry.bound == EXACT
+                                         or (entry.bound == LOWER_BOUND and score >= beta)
+                                         or (entry.bound == UPPER_BOUND and score <= alpha)):
+                stats.tt_cutoffs += 1
+                return -score
+
+        pruning = self.pruning
+        counts = stats.pruning
+        in_check = board.is_check()
+        futile = False
+
+        if not in_check:
+            static_score = -evaluation_function(board)
+
+            # Reverse futility: near the leaves a position this far above beta is not going to drop below it
+            if (pruning["ReverseFutility"] and depth <= REVERSE_FUTILITY_DEPTH and abs(beta) < MATE_BOUND
+                    and static_score - REVERSE_FUTILITY_MARGIN * depth >= beta):
+                counts["ReverseFutility"] += 1
+                return -(static_score - REVERSE_FUTILITY_MARGIN * depth)
+
+            # Null move: if passing still fails high, a real move will too. Not with only pawns left,
+            # where passing would be better than any move in a zugzwang, and never twice in a row
+            if (pruning["NullMove"] and depth >= NULL_MOVE_MIN_DEPTH and abs(beta) < MATE_BOUND
+                    and static_score >= beta and board.move_stack and board.move_stack[-1]
+                    and board.occupied_co[board.turn] & ~(board.pawns | board.kings)):
+                reduction = NULL_MOVE_REDUCTION + depth // 6
+                board.push(chess.Move.null())
+                score = self.minimax_score(board, -beta, -beta + 1, current_depth + 1,
+                                           max_depth - reduction, evaluation_function)
+                board.pop()
+                if score >= beta:
+                    counts["NullMove"] += 1
+                    return -beta
+
+            # Futility: quiet moves at the frontier can't bring a position this far below alpha back up
+            futile = (pruning["Futility"] and depth < len(FUTILITY_MARGINS) and abs(alpha) < MATE_BOUND
+                      and static_score + FUTILITY_MARGINS[depth] <= alpha)
 
         best_move = None
         best_score = -INFINITY
+        original_alpha = alpha
+        move_count = 0
+
+        # Moves are generated stage by stage, the ones after a cutoff never are
+        for move in self.move_orderer.staged_moves(board, hash_move, current_depth):
+            quiet = self.move_orderer.is_quiet(board, move)
+
+            if futile and quiet and move_count and not board.gives_check(move):
+                counts["Futility"] += 1
+                continue
+
+            # Late move reductions for quiet moves that come late in the ordering, less with a good history
+            reduction = 0
+            if (pruning["LateMoveReductions"] and quiet and not in_check and move_count >= LMR_MIN_MOVES
+                    and depth >= LMR_MIN_DEPTH and not self.move_orderer.is_killer(move, current_depth)):
+                reduction = 1 + (move_count >= 2 * LMR_MIN_MOVES) + (depth >= 6)
+                if self.move_orderer.history_score(board, move) > LMR_GOOD_HISTORY:
+                    reduction -= 1
+                reduction = min(reduction, depth - 1)
 
-        if early_stop and not board.is_check():
-            best_score = -evaluation_function(board)
-
-        children = sorted_moves(board, moves)
-
-        if len(children) == 0:
-            return evaluation_function(board)
-
-        for _, move in sorted(children, key=lambda x: x[0], reverse=True):
             board.push(move)
-
-            if timelimit and time.time() > timelimit:
-                score = self.cached_score_difference(board)
-            else:
-
-                key = board._transposition_key()
-
-                score, cached_depth = self.known_positions[key] \
-                    if key in self.known_positions else (0, 0)
-
-                # Compute depth of score estimate
-                new_depth = max_depth - current_depth
-
-                # If we could get a deeper estimate than what is in the cache
-                if new_depth > cached_depth or not caching:
+            move_count += 1
+
+            child_max_depth = max_depth
+            if board.is_check():
+                reduction = 0
+                if pruning["CheckExtensions"] and max_depth < MAX_PLY - 1:
+                    counts["CheckExtensions"] += 1
+                    child_max_depth += 1
+
+            if reduction > 0:
+                counts["LateMoveReductions"] += 1
+                score = self.minimax_score(board, -alpha - 1, -alpha, current_depth + 1,
+                                           child_max_depth - reduction, evaluation_function)
+                if score > alpha:
                     score = self.minimax_score(board, -beta, -alpha, current_depth + 1,
-                                               max_depth, timelimit, sorted_moves, evaluation_function)
-
-                    self.known_positions[key] = (score, new_depth)
-                else:
-                    cache_hits += 1
+                                               child_max_depth, evaluation_function)
+            else:
+                score = self.minimax_score(board, -beta, -alpha, current_depth + 1,
+                                           child_max_depth, evaluation_function)
 
             board.pop()
 
@@ -201,65 +327,254 @@ class ScoreEngine:
                 alpha = max(best_score, alpha)
 
             if score >= beta:
-                num_pruned += 1
+                stats.beta_cutoffs += 1
+                if move_count == 1:
+                    stats.first_move_cutoffs += 1
+                if quiet:
+                    self.move_orderer.add_cutoff(board, move, depth, current_depth)
+                self.transposition_table.store(key, depth, LOWER_BOUND, score_to_table(best_score, current_depth),
+                                               best_move)
                 return -best_score
 
+        # Checkmate or stalemate, found by the move generation instead of a separate look at the position
+        if not move_count:
+            return MATE_SCORE - current_depth if in_check else 0  # prefer shallower checkmates
+
+        bound = EXACT if best_score > original_alpha else UPPER_BOUND
+        self.transposition_table.store(key, depth, bound, score_to_table(best_score, current_depth), best_move)
+
         # print("Opponent's best move is {}".format(best_move))
         return -best_score
 
-    def play(self, board, time_limit, ponder):
-        start_time = time.time()
+    def search_root(self, board, moves, depth, alpha, beta):
+        """
+        Principal variation search over the root moves, the first move gets the full window
+        and the others a null window that is widened only if they beat the best score so far.
+        Returns the best score and the searched moves scored for the side to move.
+        """
+        scored_moves = []
+        best_score = -INFINITY
+
+        for index, move in enumerate(moves):
+            board.push(move)
+
+            if index == 0:
+                score = self.minimax_score(board, -beta, -alpha, current_depth=1, max_depth=depth)
+            else:
+                score = self.minimax_score(board, -alpha - 1, -alpha, current_depth=1, max_depth=depth)
+                if alpha < score < beta:
+                    score = self.minimax_score(board, -beta, -alpha, current_depth=1, max_depth=depth)
+
+            board.pop()
+
+            scored_moves.append((score, move))
 
+            if score > best_score:
+                best_score = score
+                alpha = max(score, alpha)
 
-        # target 50 moves
-        target_time = time_limit / 1000
-        print("Trying to make move in {} seconds".format(target_time))
-        timelimit = time.time() + target_time
+            if score >= beta:
+                break
 
-        # start_time = time.time()
-        self.store_position(board)
+        return best_score, scored_moves
 
-        # Make a list of all legal moves
-        moves = list(board.legal_moves)
+    def iterative_deepening(self, search_board, moves, first_depth=1, max_depth=None):
+        """
+        Search moves to increasing depths until the clock runs out, returns the best move and its score
+        """
+        root_ply = len(search_board.move_stack)
+        best_move = moves[0]
+        best_score = None
 
-        # Loop through each legal move
-        for depth in range(1, self.max_depth + 1):
+        # Iterative deepening, each iteration searches the best moves of the previous one first
+        for depth in range(first_depth, (max_depth or self.max_depth) + 1):
 
             print("Trying depth {}".format(depth))
 
-            best_moves = []
-            best_score = -INFINITY
+            # Aspiration window around the previous score, widened on a fail high or low
+            window = ASPIRATION_WINDOW
+            if best_score is None or abs(best_score) == INFINITY:
+                alpha, beta = -INFINITY, INFINITY
+            else:
+                alpha, beta = best_score - window, best_score + window
+
+            try:
+                while True:
+                    score, scored_moves = self.search_root(search_board, moves, depth, alpha, beta)
+                    if score <= alpha:
+                        alpha = score - window
+                    elif score >= beta:
+                        beta = score + window
+                    else:
+                        break
+                    window *= 2
+            except SearchTimeout:
+                # Unwind the moves of the aborted iteration and keep the result of the last completed one
+                while len(search_board.move_stack) > root_ply:
+                    search_board.pop()
+                print("Ran out of time at depth {}".format(depth))
+                break
 
-            for move in moves:
-                # Copy the board and preform a move on copy of board
-                new_board = board.copy()
-                new_board.push(move)
+            # sorted is stable, so moves that tie keep the order of the previous iteration
+            moves = [move for _, move in sorted(scored_moves, key=lambda x: x[0], reverse=True)]
+            best_move = moves[0]
+            best_score = score
 
-                score = self.minimax_score(new_board, current_depth=1, max_depth=depth,
-                                           timelimit=time_limit,
-                                           sorted_moves=self.get_all_moves,
-                                           evaluation_function=self.quiescence_search)
+            # print("Found best move {} with score {}".format(best_move, best_score))
 
-                if score > best_score:
-                    best_moves = [move]
-                    best_score = score
-                elif score == best_score:
-                    best_moves.append(move)
+            self.stats.end_iteration(depth, best_score, self.principal_variation(search_board, best_move, depth))
+            if self.on_iteration:
+                self.on_iteration(self.stats)
 
-            # print("Found {} moves with score {}".format(len(best_moves), best_score))
+            if self.clock.depth_reached(depth) or self.clock.soft_expired():
+                print("Stopped after depth {}".format(depth))
+                break
 
-            if timelimit and time.time() > timelimit:
-                print("Ran out of time at depth {}".format(depth))
+        return best_move, best_score
+
+    def principal_variation(self, search_board, best_move, max_length):
+        """
+        The best move followed by the hash moves of the positions it leads to
+        """
+        pv = [best_move]
+        search_board.push(best_move)
+        while len(pv) < max_length:
+            entry = self.transposition_table.probe(search_board.zobrist_hash)
+            if not entry or not entry.move or not search_board.is_legal(entry.move):
                 break
+            pv.append(entry.move)
+            search_board.push(entry.move)
+        for _ in pv:
+            search_board.pop()
+        return pv
+
+    def root_moves(self, search_board):
+        """
+        Order the root moves by the static score of the positions they lead to for the first iteration,
+        all children are scored in one batched call
+        """
+        moves = list(search_board.legal_moves)
+        children = sorted(zip(evaluate_children(search_board, moves), moves), key=lambda x: x[0], reverse=True)
+        return [move for _, move in children]
+
+    def helper_search(self, search_board, index):
+        """
+        Lazy SMP helper: search the same root as the main process until it is stopped, only to fill the
+        shared transposition table. Helpers start at alternating depths with the root moves rotated, so
+        they do not all walk the same tree in the same order.
+        """
+        moves = self.root_moves(search_board)
+        if not moves:
+            return
+        shift = index % len(moves)
+        moves = moves[:1] + moves[1:][shift:] + moves[1:][:shift]
+        self.iterative_deepening(search_board, moves, first_depth=1 + index % 2)
+
+    def search(self, search_board, max_depth=None):
+        """
+        Search search_board with the current clock, returns the best move and its score
+        """
+        self.transposition_table.new_search()
+        self.move_orderer.new_search()
+        self.stats = SearchStats()
+
+        moves = self.root_moves(search_board)
 
-        best_move = random.choice(best_moves)
-        board.push(best_move)
-        self.store_position(board)
-        board.pop()
+        if self.helpers:
+            self.helpers.start_search(search_board, self.transposition_table.generation)
+        try:
+            return self.iterative_deepening(search_board, moves, max_depth=max_depth)
+        finally:
+            if self.helpers:
+                self.helpers.stop_search()
 
-        print("Cache hits: {}. Prunes: {}. Positions: {}.".format(cache_hits, num_pruned, positions))
-        # print("Found {} moves with score {}".format(len(best_moves), best_score))
-        print("Chose random best move: {} with score {} in {} seconds on move {}".format(best_move, best_score,
-                                                                                         time.time() - start_time,
-                                                                                         len(board.move_stack)))
+    def play(self, board, time_limit, ponder, max_nodes=None, max_depth=None):
+        """
+        Search for the best move, time_limit is the time for this move in milliseconds, None to search
+        until max_nodes or max_depth. With ponder the engine keeps searching the expected reply after it
+        returns its move.
+        """
+        if time_limit is not None:
+            print("Trying to make move in {} seconds".format(time_limit / 1000))
+
+        if self.ponder_thread and list(board.move_stack) == self.ponder_moves:
+            # The opponent played the expected move, the ponder search continues on the clock of this move
+            print("Ponderhit after {} seconds".format(self.clock.elapsed()))
+            self.clock.ponderhit(time_limit, max_nodes, max_depth)
+            self.ponder_thread.join()
+            self.ponder_thread = None
+            search_board = self.ponder_board
+            best_move, best_score = self.ponder_result
+        else:
+            self.stop_pondering()
+            self.clock = SearchClock(time_limit, max_nodes=max_nodes)
+            search_board = SearchBoard.from_board(board)
+            best_move, best_score = self.search(search_board, max_depth)
+
+        search_board.push(best_move)
+
+        self.last_stats = self.stats
+        print("Nodes: {}. Depth: {}. Nps: {}. {}".format(self.stats.total_nodes, self.stats.depth, self.stats.nps(),
+                                                         self.stats.summary()))
+        print("Chose best move: {} with score {} in {} seconds on move {}".format(best_move, best_score,
+                                                                                  self.clock.elapsed(),
+                                                                                  len(board.move_stack)))
+        if ponder:
+            self.start_pondering(search_board)
         return best_move
+
+    def start_pondering(self, search_board):
+        """
+        Search the position after the expected reply in a background thread, search_board is the position
+        after our move. The reply is the best move the transposition table has for it.
+        """
+        entry = self.transposition_table.probe(search_board.zobrist_hash)
+        if not entry or not entry.move or not search_board.is_legal(entry.move):
+            return
+
+        search_board.push(entry.move)
+        if search_board.is_game_over():
+            return
+
+        self.ponder_moves = list(search_board.move_stack)
+        self.ponder_board = search_board
+        self.ponder_result = None
+        self.clock = SearchClock()
+
+        def ponder_search():
+            self.ponder_result = self.search(search_board)
+
+        print("Pondering on {}".format(entry.move))
+        self.ponder_thread = threading.Thread(target=ponder_search, daemon=True)
+        self.ponder_thread.start()
+
+    def stop_pondering(self):
+        if self.ponder_thread:
+            self.clock.stop()
+            self.ponder_thread.join()
+            self.ponder_thread = None
+
+    def info(self, stats, turn):
+        """
+        Stats of a search in the form of chess.engine.InfoDict, turn is the side to move at the root
+        """
+        info = {"depth": stats.depth, "nodes": stats.total_nodes, "nps": stats.nps(), "time": stats.elapsed(),
+                "pv": stats.pv, "string": stats.summary()}
+        if stats.score is not None:
+            info["score"] = stats.pov_score(turn, mate_distance(stats.score))
+        return info
+
+    def new_game(self):
+        self.stop_pondering()
+        self.transposition_table.clear()
+        self.move_orderer = MoveOrderer()
+
+    def quit(self):
+        """
+        Stop pondering and the helper processes, and free the shared transposition table
+        """
+        self.stop_pondering()
+        if self.helpers:
+            self.helpers.close()
+            self.helpers = None
+            self.transposition_table.close(unlink=True)
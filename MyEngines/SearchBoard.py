@@ -0,0 +1,287 @@
+import chess
+import chess.polyglot
+
+from MyEngines.Evaluation import TAPERED_PIECE_SQUARE, PHASE_BY_PIECE
+
+ZOBRIST = chess.polyglot.POLYGLOT_RANDOM_ARRAY
+ZOBRIST_HASHER = chess.polyglot.ZobristHasher(ZOBRIST)
+ZOBRIST_EP = 772
+ZOBRIST_TURN = ZOBRIST[780]
+
+PIECE_VALUES = {
+    chess.KING: 0,
+    chess.QUEEN: 900,
+    chess.ROOK: 500,
+    chess.BISHOP: 320,
+    chess.KNIGHT: 310,
+    chess.PAWN: 100
+}
+
+# Piece square tables from white's point of view, rank 8 first
+PIECE_SQUARE_TABLES = {
+    chess.PAWN: [
+        0, 0, 0, 0, 0, 0, 0, 0,
+        50, 50, 50, 50, 50, 50, 50, 50,
+        10, 10, 20, 30, 30, 20, 10, 10,
+        5, 5, 10, 25, 25, 10, 5, 5,
+        0, 0, 0, 20, 20, 0, 0, 0,
+        5, -5, -10, 0, 0, -10, -5, 5,
+        5, 10, 10, -20, -20, 10, 10, 5,
+        0, 0, 0, 0, 0, 0, 0, 0],
+    chess.KNIGHT: [
+        -50, -40, -30, -30, -30, -30, -40, -50,
+        -40, -20, 0, 0, 0, 0, -20, -40,
+        -30, 0, 10, 15, 15, 10, 0, -30,
+        -30, 5, 15, 20, 20, 15, 5, -30,
+        -30, 0, 15, 20, 20, 15, 0, -30,
+        -30, 5, 10, 15, 15, 10, 5, -30,
+        -40, -20, 0, 5, 5, 0, -20, -40,
+        -50, -40, -30, -30, -30, -30, -40, -50],
+    chess.BISHOP: [
+        -20, -10, -10, -10, -10, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 10, 10, 5, 0, -10,
+        -10, 5, 5, 10, 10, 5, 5, -10,
+        -10, 0, 10, 10, 10, 10, 0, -10,
+        -10, 10, 10, 10, 10, 10, 10, -10,
+        -10, 5, 0, 0, 0, 0, 5, -10,
+        -20, -10, -10, -10, -10, -10, -10, -20],
+    chess.ROOK: [
+        0, 0, 0, 0, 0, 0, 0, 0,
+        5, 10, 10, 10, 10, 10, 10, 5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        0, 0, 0, 5, 5, 0, 0, 0],
+    chess.QUEEN: [
+        -20, -10, -10, -5, -5, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 5, 5, 5, 0, -10,
+        -5, 0, 5, 5, 5, 5, 0, -5,
+        0, 0, 5, 5, 5, 5, 0, -5,
+        -10, 5, 5, 5, 5, 5, 0, -10,
+        -10, 0, 5, 0, 0, 0, 0, -10,
+        -20, -10, -10, -5, -5, -10, -10, -20],
+    chess.KING: [
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -20, -30, -30, -40, -40, -30, -30, -20,
+        -10, -20, -20, -20, -20, -20, -20, -10,
+        20, 20, 0, 0, 0, 0, 20, 20,
+        20, 30, 10, 0, 0, 10, 30, 20]
+}
+
+
+def piece_index(piece_type, color):
+    # Same piece numbering as the polyglot random array
+    return (piece_type - 1) * 2 + color
+
+
+# Flat lookups indexed by [piece_index(piece_type, color)][square], signed from white's point of view.
+# Material and piece-square values order the root moves in MyEngines.BatchEvaluation.
+MATERIAL_BY_PIECE = [0] * 12
+PIECE_SQUARE = [[0] * 64 for _ in range(12)]
+ZOBRIST_PIECE = [[0] * 64 for _ in range(12)]
+
+for _piece_type in chess.PIECE_TYPES:
+    for _color in chess.COLORS:
+        _index = piece_index(_piece_type, _color)
+        _sign = 1 if _color == chess.WHITE else -1
+        MATERIAL_BY_PIECE[_index] = _sign * PIECE_VALUES[_piece_type]
+        for _square in chess.SQUARES:
+            _table_square = _square ^ 56 if _color == chess.WHITE else _square
+            PIECE_SQUARE[_index][_square] = _sign * PIECE_SQUARE_TABLES[_piece_type][_table_square]
+            ZOBRIST_PIECE[_index][_square] = ZOBRIST[64 * _index + _square]
+
+
+def castling_hash(board):
+    return ZOBRIST_HASHER.hash_castling(board)
+
+
+def ep_hash(board):
+    # Polyglot only hashes the en passant file when a pawn could capture there
+    ep_square = board.ep_square
+    if ep_square is None:
+        return 0
+    if board.pawns & board.occupied_co[board.turn] & chess.BB_PAWN_ATTACKS[not board.turn][ep_square]:
+        return ZOBRIST[ZOBRIST_EP + chess.square_file(ep_square)]
+    return 0
+
+
+class SearchBoard(chess.Board):
+    """
+    chess.Board used by the search that keeps its polyglot zobrist hash,
+    the packed middlegame/endgame sum and the game phase that
+    MyEngines.Evaluation tapers between up to date on push and pop.
+
+    The sum is kept from white's point of view. Only push, pop and copy are
+    tracked, call `refresh` after editing the position in any other way.
+
+    The hashes of all positions since the root are kept on `hash_stack`,
+    so `is_repeated` only has to compare hashes back to the last
+    irreversible move.
+    """
+
+    def __init__(self, fen=chess.STARTING_FEN, *, chess960=False):
+        self.accumulator_stack = []
+        super().__init__(fen, chess960=chess960)
+        self.refresh()
+
+    @classmethod
+    def from_board(cls, board):
+        """
+        Copy a board, including its move stack
+        """
+        search_board = cls(board.root().fen(), chess960=board.chess960)
+        for move in board.move_stack:
+            search_board.push(move)
+        return search_board
+
+    def refresh(self):
+        """
+        Recompute the accumulators from scratch
+        """
+        self.zobrist_hash = 0
+        self.tapered = 0
+        self.phase = 0
+
+        for square, piece in self.piece_map().items():
+            index = piece_index(piece.piece_type, piece.color)
+            self.zobrist_hash ^= ZOBRIST_PIECE[index][square]
+            self.tapered += TAPERED_PIECE_SQUARE[index][square]
+            self.phase += PHASE_BY_PIECE[index]
+
+        self.castling_hash = castling_hash(self)
+        self.ep_hash = ep_hash(self)
+        self.zobrist_hash ^= self.castling_hash ^ self.ep_hash
+        if self.turn == chess.WHITE:
+            self.zobrist_hash ^= ZOBRIST_TURN
+
+        # the positions before this one are unknown
+        self.hash_stack = [self.zobrist_hash]
+        self.reversible_plies = 0
+
+    def copy(self, *, stack=True):
+        board = super().copy(stack=stack)
+        board.zobrist_hash = self.zobrist_hash
+        board.tapered = self.tapered
+        board.phase = self.phase
+        board.castling_hash = self.castling_hash
+        board.ep_hash = self.ep_hash
+        if stack and board.move_stack:
+            board.accumulator_stack = self.accumulator_stack[-len(board.move_stack):]
+            board.hash_stack = self.hash_stack[-len(board.move_stack) - 1:]
+        else:
+            board.hash_stack = [self.zobrist_hash]
+        board.reversible_plies = min(self.reversible_plies, len(board.hash_stack) - 1)
+        return board
+
+    def push(self, move):
+        self.accumulator_stack.append((self.zobrist_hash, self.tapered, self.phase, self.castling_hash, self.ep_hash,
+                                       self.reversible_plies))
+
+        zobrist_hash = self.zobrist_hash ^ ZOBRIST_TURN ^ self.ep_hash
+
+        if not move:
+            super().push(move)
+            self.zobrist_hash = zobrist_hash
+            self.ep_hash = 0
+            # nothing before a null move counts as a repetition
+            self.hash_stack.append(zobrist_hash)
+            self.reversible_plies = 0
+            return
+
+        move = self._to_chess960(move)
+        turn = self.turn
+        from_square = move.from_square
+        to_square = move.to_square
+        piece_type = self.piece_type_at(from_square)
+        castling = piece_type == chess.KING and self.occupied_co[turn] & chess.BB_SQUARES[to_square]
+        castling_rights = self.castling_rights
+
+        tapered = self.tapered
+        phase = self.phase
+
+        # Lift the moving piece
+        moving = piece_index(piece_type, turn)
+        zobrist_hash ^= ZOBRIST_PIECE[moving][from_square]
+        tapered -= TAPERED_PIECE_SQUARE[moving][from_square]
+
+        if castling:
+            rook = piece_index(chess.ROOK, turn)
+            zobrist_hash ^= ZOBRIST_PIECE[rook][to_square]
+            tapered -= TAPERED_PIECE_SQUARE[rook][to_square]
+        else:
+            captured_type = self.piece_type_at(to_square)
+            capture_square = to_square
+            if (piece_type == chess.PAWN and not captured_type and to_square == self.ep_square
+                    and chess.square_file(from_square) != chess.square_file(to_square)):
+                captured_type = chess.PAWN
+                capture_square = to_square - 8 if turn == chess.WHITE else to_square + 8
+            if captured_type:
+                captured = piece_index(captured_type, not turn)
+                zobrist_hash ^= ZOBRIST_PIECE[captured][capture_square]
+                tapered -= TAPERED_PIECE_SQUARE[captured][capture_square]
+                phase -= PHASE_BY_PIECE[captured]
+
+        super().push(move)
+
+        # Drop the moved pieces on their new squares
+        if castling:
+            a_side = chess.square_file(to_square) < chess.square_file(from_square)
+            rank = chess.square_rank(from_square)
+            king_square = chess.square(2 if a_side else 6, rank)
+            rook_square = chess.square(3 if a_side else 5, rank)
+            zobrist_hash ^= ZOBRIST_PIECE[moving][king_square] ^ ZOBRIST_PIECE[rook][rook_square]
+            tapered += TAPERED_PIECE_SQUARE[moving][king_square] + TAPERED_PIECE_SQUARE[rook][rook_square]
+        else:
+            if move.promotion:
+                placed = piece_index(move.promotion, turn)
+                phase += PHASE_BY_PIECE[placed]
+            else:
+                placed = moving
+            zobrist_hash ^= ZOBRIST_PIECE[placed][to_square]
+            tapered += TAPERED_PIECE_SQUARE[placed][to_square]
+
+        if self.castling_rights != castling_rights:
+            new_castling_hash = castling_hash(self)
+            zobrist_hash ^= self.castling_hash ^ new_castling_hash
+            self.castling_hash = new_castling_hash
+
+        self.ep_hash = ep_hash(self) if self.ep_square is not None else 0
+
+        self.zobrist_hash = zobrist_hash ^ self.ep_hash
+        self.tapered = tapered
+        self.phase = phase
+
+        self.hash_stack.append(self.zobrist_hash)
+        # Pawn moves, captures and lost castling rights can't be undone
+        if self.halfmove_clock == 0 or self.castling_rights != castling_rights:
+            self.reversible_plies = 0
+        else:
+            self.reversible_plies += 1
+
+    def pop(self):
+        move = super().pop()
+        if self.accumulator_stack:
+            (self.zobrist_hash, self.tapered, self.phase, self.castling_hash, self.ep_hash,
+             self.reversible_plies) = self.accumulator_stack.pop()
+            self.hash_stack.pop()
+        else:
+            self.refresh()
+        return move
+
+    def is_repeated(self):
+        """
+        Whether the position occurred before since the last irreversible move, the search scores this as a draw
+        """
+        stack = self.hash_stack
+        key = self.zobrist_hash
+        for plies in range(4, min(self.reversible_plies, len(stack) - 1) + 1, 2):
+            if stack[-1 - plies] == key:
+                return True
+        return False
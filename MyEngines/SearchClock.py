@@ -0,0 +1,110 @@
+import time
+
+from math import inf as INFINITY
+
+# How many nodes are searched between two looks at the clock
+DEFAULT_POLL_INTERVAL = 256
+
+# Part of the move time after which no new iteration is started
+DEFAULT_SOFT_RATIO = 0.5
+
+# Moves the remaining clock is divided over when the time control doesn't say
+DEFAULT_MOVES_TO_GO = 40
+
+
+def move_time(remaining, increment=0, moves_to_go=None):
+    """
+    Time to spend on this move, in the unit of remaining. Never plans to use more than half of the clock.
+    """
+    return min(remaining / (moves_to_go or DEFAULT_MOVES_TO_GO) + (increment or 0), remaining / 2)
+
+
+class SearchTimeout(Exception):
+    """
+    Raised from inside the search when the hard limit has passed or the search was stopped
+    """
+    pass
+
+
+class SearchClock:
+    """
+    Monotonic deadline for one search.
+
+    The search calls `tick` once per node and the clock is only read every
+    `poll_interval` nodes. Past the hard limit `tick` raises SearchTimeout,
+    which unwinds the whole search. The soft limit is checked between
+    iterations, since an iteration that starts late will not finish in time.
+    """
+
+    def __init__(self, time_limit=None, poll_interval=DEFAULT_POLL_INTERVAL, soft_ratio=DEFAULT_SOFT_RATIO,
+                 should_stop=None, max_nodes=None, max_depth=None):
+        """
+        :param time_limit: Time for the move in milliseconds, None to search without a limit
+        :param should_stop: Optional function polled with the clock, the search stops once it returns True
+        :param max_nodes: Optional node budget, checked at the same polls as the time
+        :param max_depth: Optional depth limit, the search stops once an iteration of this depth is finished
+        """
+        self.start_time = time.monotonic()
+        self.poll_interval = poll_interval
+        self.soft_ratio = soft_ratio
+        self.should_stop = should_stop
+        self.max_nodes = max_nodes
+        self.max_depth = max_depth
+        self.nodes = 0
+        self.depth = 0
+        self.stopped = False
+
+        if time_limit is None:
+            self.soft_deadline = self.hard_deadline = INFINITY
+        else:
+            self.soft_deadline = self.start_time + soft_ratio * time_limit / 1000
+            self.hard_deadline = self.start_time + time_limit / 1000
+
+    def depth_reached(self, depth):
+        """
+        Record a finished iteration, True if it reached the depth limit
+        """
+        self.depth = depth
+        return self.max_depth is not None and depth >= self.max_depth
+
+    def tick(self):
+        self.nodes += 1
+        if self.nodes % self.poll_interval == 0:
+            self.check()
+
+    def check(self):
+        if (self.stopped or time.monotonic() > self.hard_deadline
+                or (self.max_nodes is not None and self.nodes >= self.max_nodes)
+                or (self.max_depth is not None and self.depth >= self.max_depth)
+                or (self.should_stop is not None and self.should_stop())):
+            self.stopped = True
+            raise SearchTimeout()
+
+    def ponderhit(self, time_limit, max_nodes=None, max_depth=None):
+        """
+        Give a running ponder search the limits of the move, time_limit in milliseconds from now or None
+        for no deadline.
+
+        The time and nodes already spent pondering are credited to the search,
+        so the limits count from the start of the ponder search. If one has
+        already passed the search stops now with its last finished iteration.
+        """
+        self.max_nodes = max_nodes
+        self.max_depth = max_depth
+        if time_limit is None:
+            return
+        now = time.monotonic()
+        self.soft_deadline = self.start_time + self.soft_ratio * (now - self.start_time + time_limit / 1000)
+        self.hard_deadline = now + time_limit / 1000 if self.soft_deadline > now else now
+
+    def stop(self):
+        """
+        Abort the search at the next poll
+        """
+        self.stopped = True
+
+    def soft_expired(self):
+        return self.stopped or time.monotonic() > self.soft_deadline
+
+    def elapsed(self):
+        return time.monotonic() - self.start_time
@@ -0,0 +1,103 @@
+import time
+from collections import Counter
+
+import chess.engine
+
+
+class SearchStats:
+    """
+    Counters for one search, created fresh for every move.
+
+    The search bumps the counters directly, the rates are derived when they
+    are read. `end_iteration` records the depth, score and principal
+    variation of every finished iteration of iterative deepening.
+    """
+
+    def __init__(self):
+        self.start_time = time.monotonic()
+
+        self.nodes = 0
+        self.qnodes = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.tt_cutoffs = 0
+        self.beta_cutoffs = 0
+        self.first_move_cutoffs = 0
+        # How often each selective search technique fired
+        self.pruning = Counter()
+
+        self.depth = 0
+        self.score = None
+        self.pv = []
+        # (depth, total nodes, seconds) at the end of every finished iteration
+        self.iterations = []
+
+    @property
+    def total_nodes(self):
+        return self.nodes + self.qnodes
+
+    def elapsed(self):
+        return time.monotonic() - self.start_time
+
+    def nps(self):
+        return int(self.total_nodes / max(self.elapsed(), 1e-6))
+
+    def end_iteration(self, depth, score, pv):
+        self.depth = depth
+        self.score = score
+        self.pv = pv
+        self.iterations.append((depth, self.total_nodes, self.elapsed()))
+
+    def first_move_cutoff_rate(self):
+        """
+        Share of the beta cutoffs caused by the first move searched, a measure of the move ordering
+        """
+        return self.first_move_cutoffs / self.beta_cutoffs if self.beta_cutoffs else 0
+
+    def iteration_nodes(self):
+        """
+        Nodes searched in each finished iteration
+        """
+        nodes = []
+        previous = 0
+        for _, total, _ in self.iterations:
+            nodes.append(total - previous)
+            previous = total
+        return nodes
+
+    def effective_branching_factor(self):
+        """
+        Nodes of the last finished iteration divided by the nodes of the one before it
+        """
+        nodes = self.iteration_nodes()
+        if len(nodes) < 2 or not nodes[-2]:
+            return 0
+        return nodes[-1] / nodes[-2]
+
+    def iteration_times(self):
+        """
+        Seconds spent on each finished iteration
+        """
+        times = []
+        previous = 0
+        for _, _, seconds in self.iterations:
+            times.append(seconds - previous)
+            previous = seconds
+        return times
+
+    def pov_score(self, turn, mate_plies=None):
+        """
+        The score as a chess.engine.PovScore for the side to move (turn), mate_plies is the mate distance if it is one
+        """
+        if mate_plies is not None:
+            score = chess.engine.Mate((mate_plies + 1) // 2 if self.score > 0 else -(mate_plies // 2))
+        else:
+            score = chess.engine.Cp(int(round(self.score or 0)))
+        return chess.engine.PovScore(score, turn)
+
+    def summary(self):
+        return ("qnodes {} ttprobes {} tthits {} ttcutoffs {} firstmovecutoffs {:.1%} ebf {:.2f} "
+                "iterations {} {}").format(
+            self.qnodes, self.tt_probes, self.tt_hits, self.tt_cutoffs, self.first_move_cutoff_rate(),
+            self.effective_branching_factor(), " ".join("{:.3f}".format(seconds) for seconds in self.iteration_times()),
+            " ".join("{} {}".format(name, count) for name, count in sorted(self.pruning.items()))).strip()
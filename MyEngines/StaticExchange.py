@@ -0,0 +1,86 @@
+import chess
+
+# Piece values used for exchanges, the king can be "captured" last but is worth more than anything
+SEE_VALUES = [0, 100, 310, 320, 500, 900, 20000]
+
+
+def attackers_to(board, square, occupied):
+    """
+    Bitboard of pieces of both colors attacking square, sliders are blocked only by occupied
+    """
+    queens_and_rooks = board.queens | board.rooks
+    queens_and_bishops = board.queens | board.bishops
+
+    return ((chess.BB_KING_ATTACKS[square] & board.kings)
+            | (chess.BB_KNIGHT_ATTACKS[square] & board.knights)
+            | (chess.BB_RANK_ATTACKS[square][chess.BB_RANK_MASKS[square] & occupied] & queens_and_rooks)
+            | (chess.BB_FILE_ATTACKS[square][chess.BB_FILE_MASKS[square] & occupied] & queens_and_rooks)
+            | (chess.BB_DIAG_ATTACKS[square][chess.BB_DIAG_MASKS[square] & occupied] & queens_and_bishops)
+            | (chess.BB_PAWN_ATTACKS[chess.BLACK][square] & board.pawns & board.occupied_co[chess.WHITE])
+            | (chess.BB_PAWN_ATTACKS[chess.WHITE][square] & board.pawns & board.occupied_co[chess.BLACK])) & occupied
+
+
+def least_valuable_attacker(board, attackers):
+    for piece_type, pieces in ((chess.PAWN, board.pawns), (chess.KNIGHT, board.knights),
+                               (chess.BISHOP, board.bishops), (chess.ROOK, board.rooks),
+                               (chess.QUEEN, board.queens), (chess.KING, board.kings)):
+        if attackers & pieces:
+            return piece_type, chess.lsb(attackers & pieces)
+    return None, None
+
+
+def see(board, move):
+    """
+    Static exchange evaluation: the material the side to move wins with move
+    when both sides keep recapturing on the target square with their least
+    valuable piece, and may stop whenever recapturing would lose material.
+
+    Pieces uncovered behind a capturing piece (x-rays) join the exchange. Pins are ignored.
+    """
+    to_square = move.to_square
+    mover = board.turn
+    occupied = board.occupied ^ chess.BB_SQUARES[move.from_square]
+
+    victim = board.piece_type_at(to_square)
+    if victim is None and board.is_en_passant(move):
+        victim = chess.PAWN
+        occupied ^= chess.BB_SQUARES[to_square - 8 if mover == chess.WHITE else to_square + 8]
+
+    gains = [SEE_VALUES[victim or 0]]
+    on_square = board.piece_type_at(move.from_square)
+    if move.promotion:
+        gains[0] += SEE_VALUES[move.promotion] - SEE_VALUES[chess.PAWN]
+        on_square = move.promotion
+
+    side = not mover
+    attackers = attackers_to(board, to_square, occupied)
+
+    while True:
+        side_attackers = attackers & board.occupied_co[side]
+        if not side_attackers:
+            break
+
+        piece_type, square = least_valuable_attacker(board, side_attackers)
+        if piece_type == chess.KING and attackers & board.occupied_co[not side]:
+            # the king cannot recapture on a defended square
+            break
+
+        # what side gains by capturing, if the exchange were to stop afterwards
+        gains.append(SEE_VALUES[on_square] - gains[-1])
+        on_square = piece_type
+        occupied ^= chess.BB_SQUARES[square]
+        attackers = attackers_to(board, to_square, occupied)
+        side = not side
+
+    # Either side can stand pat instead of recapturing
+    for index in range(len(gains) - 1, 0, -1):
+        gains[index - 1] = -max(-gains[index - 1], gains[index])
+
+    return gains[0]
+
+
+def see_ge(board, move, threshold=0):
+    """
+    True if the exchange started by move wins at least threshold centipawns
+    """
+    return see(board, move) >= threshold
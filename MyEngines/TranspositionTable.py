@@ -0,0 +1,162 @@
+from array import array
+from collections import namedtuple
+
+import chess
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    # Python 3.7 has no shared memory, every table is then local to its process
+    shared_memory = None
+
+# Bound types stored with every entry
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+DEFAULT_HASH_MB = 16
+
+# Every entry is two 64-bit words: the zobrist key xor the data word, and the packed data word
+ENTRY_WORDS = 2
+ENTRY_BYTES = ENTRY_WORDS * 8
+BUCKET_SIZE = 2
+
+# Layout of the data word
+MOVE_BITS = 16
+DEPTH_SHIFT = 16
+BOUND_SHIFT = 24
+AGE_SHIFT = 26
+SCORE_SHIFT = 34
+
+MAX_DEPTH = 0xFF
+SCORE_OFFSET = 1 << 29
+MAX_SCORE = SCORE_OFFSET - 1
+
+TTEntry = namedtuple("TTEntry", ["depth", "bound", "score", "move"])
+
+
+def pack_move(move):
+    if not move:
+        return 0
+    return move.from_square | (move.to_square << 6) | ((move.promotion or 0) << 12)
+
+
+def unpack_move(packed):
+    if not packed:
+        return None
+    return chess.Move(packed & 0x3F, (packed >> 6) & 0x3F, (packed >> 12) or None)
+
+
+class TranspositionTable:
+    """
+    Fixed size hash table of search results keyed by 64-bit zobrist hashes.
+
+    The table is a flat array of 64-bit words, so its memory use is decided
+    once from the `Hash` option (in megabytes) and never grows.
+    Entries are grouped in buckets of two; when a bucket is full the entry
+    with the lowest depth, penalised by how many searches ago it was written,
+    is replaced.
+
+    With `shared=True` the words live in a multiprocessing shared memory
+    block that other processes attach to by `name`. Processes write without
+    locks; the key is stored xor-ed with the data word, so an entry torn by
+    two concurrent writes no longer matches its key and is ignored.
+    Shared memory needs Python 3.8, on 3.7 the table stays local.
+    """
+
+    def __init__(self, hash_size=DEFAULT_HASH_MB, shared=False, name=None):
+        entries = max(BUCKET_SIZE, int(hash_size * 1024 * 1024) // ENTRY_BYTES)
+        # round down to a power of two so the bucket index is a mask
+        entries = 1 << (entries.bit_length() - 1)
+
+        self.capacity = entries
+        self.bucket_mask = entries // BUCKET_SIZE - 1
+        self.generation = 0
+        self.shared_memory = None
+        self.name = None
+
+        if (shared or name) and shared_memory:
+            if name:
+                self.shared_memory = shared_memory.SharedMemory(name=name)
+            else:
+                self.shared_memory = shared_memory.SharedMemory(create=True, size=entries * ENTRY_BYTES)
+            self.name = self.shared_memory.name
+            self.table = self.shared_memory.buf[:entries * ENTRY_BYTES].cast("Q")
+        else:
+            self.table = array("Q", [0]) * (entries * ENTRY_WORDS)
+
+    def clear(self):
+        if self.shared_memory:
+            self.shared_memory.buf[:len(self.table) * 8] = bytes(len(self.table) * 8)
+        else:
+            self.table = array("Q", [0]) * len(self.table)
+        self.generation = 0
+
+    def close(self, unlink=False):
+        """
+        Detach from the shared memory block, the process that created it should also unlink it
+        """
+        if self.shared_memory:
+            self.table.release()
+            self.table = array("Q")
+            self.shared_memory.close()
+            if unlink:
+                self.shared_memory.unlink()
+            self.shared_memory = None
+
+    def new_search(self):
+        """
+        Age the table, called once per move searched
+        """
+        self.generation = (self.generation + 1) & 0xFF
+
+    def probe(self, key):
+        table = self.table
+        index = (key & self.bucket_mask) * BUCKET_SIZE * ENTRY_WORDS
+
+        for slot in range(index, index + BUCKET_SIZE * ENTRY_WORDS, ENTRY_WORDS):
+            data = table[slot + 1]
+            if table[slot] ^ data == key:
+                if not data:
+                    return None
+                return TTEntry((data >> DEPTH_SHIFT) & 0xFF,
+                               (data >> BOUND_SHIFT) & 0x3,
+                               (data >> SCORE_SHIFT) - SCORE_OFFSET,
+                               unpack_move(data & 0xFFFF))
+        return None
+
+    def store(self, key, depth, bound, score, move=None):
+        table = self.table
+        index = (key & self.bucket_mask) * BUCKET_SIZE * ENTRY_WORDS
+        generation = self.generation
+
+        replace = index
+        replace_worth = None
+        for slot in range(index, index + BUCKET_SIZE * ENTRY_WORDS, ENTRY_WORDS):
+            data = table[slot + 1]
+            if table[slot] ^ data == key:
+                replace = slot
+                # keep the old best move if the new result has none
+                if not move and data:
+                    move = unpack_move(data & 0xFFFF)
+                break
+
+            if not data:
+                worth = -MAX_DEPTH * 8
+            else:
+                age = (generation - ((data >> AGE_SHIFT) & 0xFF)) & 0xFF
+                worth = ((data >> DEPTH_SHIFT) & 0xFF) - 4 * age
+            if replace_worth is None or worth < replace_worth:
+                replace = slot
+                replace_worth = worth
+
+        depth = min(max(int(depth), 0), MAX_DEPTH)
+        score = min(max(round(score), -MAX_SCORE), MAX_SCORE)
+
+        data = (pack_move(move)
+                | (depth << DEPTH_SHIFT)
+                | (bound << BOUND_SHIFT)
+                | ((generation & 0xFF) << AGE_SHIFT)
+                | ((score + SCORE_OFFSET) << SCORE_SHIFT))
+        table[replace] = key ^ data
+        table[replace + 1] = data
@@ -0,0 +1,260 @@
+import sys
+import threading
+
+import chess
+
+from MyEngines.ScoreEngine import ScoreEngine, PRUNING_OPTIONS
+from MyEngines.SearchBoard import SearchBoard
+from MyEngines.SearchClock import SearchClock, move_time
+from MyEngines.TranspositionTable import DEFAULT_HASH_MB
+
+MAX_HASH_MB = 4096
+MAX_THREADS = 64
+
+# go parameters followed by a number
+GO_VALUES = ["wtime", "btime", "winc", "binc", "movestogo", "movetime", "depth", "nodes", "mate"]
+
+
+def parse_option(tokens):
+    """
+    (lower case name, value) of the tokens after setoption: name <name> [value <value>], names can contain spaces
+    """
+    if "value" in tokens:
+        split = tokens.index("value")
+        name, value = " ".join(tokens[1:split]), " ".join(tokens[split + 1:])
+    else:
+        name, value = " ".join(tokens[1:]), None
+    return name.lower(), value
+
+
+def parse_position(tokens, chess960=False):
+    """
+    The board of the tokens after position: startpos or fen <fen>, then optionally moves <moves>
+    """
+    if "moves" in tokens:
+        split = tokens.index("moves")
+        moves = tokens[split + 1:]
+        tokens = tokens[:split]
+    else:
+        moves = []
+
+    if tokens[0] == "startpos":
+        board = chess.Board(chess960=chess960)
+    else:
+        board = chess.Board(" ".join(tokens[1:]), chess960=chess960)
+    for move in moves:
+        board.push_uci(move)
+    return board
+
+
+def parse_go(tokens):
+    """
+    {name: value} of the GO_VALUES among the tokens after go
+    """
+    values = {}
+    for index, token in enumerate(tokens[:-1]):
+        if token in GO_VALUES:
+            values[token] = int(tokens[index + 1])
+    return values
+
+
+def go_time_limit(values, turn):
+    """
+    Time for the move in milliseconds from the go values, None if they have no time in them
+    """
+    if "movetime" in values:
+        return values["movetime"]
+    if ("wtime" if turn == chess.WHITE else "btime") in values:
+        clock = values["wtime" if turn == chess.WHITE else "btime"]
+        increment = values.get("winc" if turn == chess.WHITE else "binc", 0)
+        return move_time(clock, increment, values.get("movestogo"))
+    return None
+
+
+class UCI:
+    """
+    UCI protocol loop around MyEngines.ScoreEngine.
+
+    Commands are read on the calling thread and every search runs on a
+    thread of its own, so `stop` and `ponderhit` are handled while it
+    searches. The result of a `go ponder` or `go infinite` search is only
+    sent once the GUI releases it with `ponderhit` or `stop`.
+    """
+
+    def __init__(self, output=sys.stdout):
+        self.output = output
+        # the search thread and the command thread both send
+        self.send_lock = threading.Lock()
+        self.hash_size = DEFAULT_HASH_MB
+        self.threads = 1
+        self.pruning = {name: True for name in PRUNING_OPTIONS}
+        self.chess960 = False
+        self.engine = None
+        self.board = chess.Board()
+
+        self.search_thread = None
+        self.release = threading.Event()
+        self.ponder_time = None
+
+    def send(self, line):
+        with self.send_lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+    def get_engine(self):
+        if self.engine is None:
+            self.engine = ScoreEngine(hash_size=self.hash_size, threads=self.threads, pruning=self.pruning)
+            self.engine.on_iteration = self.send_info
+        return self.engine
+
+    def run(self, lines):
+        for line in lines:
+            if not self.handle(line):
+                break
+        self.stop_search()
+        if self.engine:
+            self.engine.quit()
+
+    def handle(self, line):
+        """
+        Handle one command, returns False on quit
+        """
+        tokens = line.split()
+        if not tokens:
+            return True
+        command = tokens[0]
+
+        if command == "uci":
+            self.send("id name ScoreEngine")
+            self.send("id author ExoHumann")
+            self.send("option name Hash type spin default {} min 1 max {}".format(DEFAULT_HASH_MB, MAX_HASH_MB))
+            self.send("option name Threads type spin default 1 min 1 max {}".format(MAX_THREADS))
+            self.send("option name Ponder type check default false")
+            self.send("option name UCI_Chess960 type check default false")
+            for name in PRUNING_OPTIONS:
+                self.send("option name {} type check default true".format(name))
+            self.send("uciok")
+        elif command == "isready":
+            self.get_engine()
+            self.send("readyok")
+        elif command == "setoption":
+            self.set_option(tokens[1:])
+        elif command == "ucinewgame":
+            self.stop_search()
+            self.get_engine().new_game()
+        elif command == "position":
+            self.stop_search()
+            self.set_position(tokens[1:])
+        elif command == "go":
+            self.stop_search()
+            self.go(tokens[1:])
+        elif command == "stop":
+            self.stop_search()
+        elif command == "ponderhit":
+            self.ponderhit()
+        elif command == "quit":
+            return False
+        return True
+
+    def set_option(self, tokens):
+        name, value = parse_option(tokens)
+
+        pruning = {option.lower(): option for option in PRUNING_OPTIONS}
+
+        if name == "hash" or name == "threads" or name in pruning:
+            if name == "hash":
+                self.hash_size = min(max(int(value), 1), MAX_HASH_MB)
+            elif name == "threads":
+                self.threads = min(max(int(value), 1), MAX_THREADS)
+            else:
+                self.pruning[pruning[name]] = value == "true"
+            # the table and the helper processes are set up when the engine starts
+            self.stop_search()
+            if self.engine:
+                self.engine.quit()
+                self.engine = None
+        elif name == "uci_chess960":
+            self.chess960 = value == "true"
+            self.board.chess960 = self.chess960
+
+    def set_position(self, tokens):
+        if tokens:
+            self.board = parse_position(tokens, self.chess960)
+
+    def go(self, tokens):
+        values = parse_go(tokens)
+        infinite = "infinite" in tokens
+        ponder = "ponder" in tokens
+        time_limit = go_time_limit(values, self.board.turn)
+
+        engine = self.get_engine()
+        self.ponder_time = time_limit if ponder else None
+        engine.clock = SearchClock(None if ponder or infinite else time_limit, max_nodes=values.get("nodes"))
+
+        self.release.clear()
+        if not ponder and not infinite:
+            self.release.set()
+
+        search_board = SearchBoard.from_board(self.board)
+        max_depth = values.get("depth") or (2 * values["mate"] if "mate" in values else None)
+        self.search_thread = threading.Thread(target=self.search, args=(engine, search_board, max_depth),
+                                              daemon=True)
+        self.search_thread.start()
+
+    def search(self, engine, search_board, max_depth):
+        if not any(search_board.generate_legal_moves()):
+            self.release.wait()
+            self.send("bestmove 0000")
+            return
+
+        best_move, best_score = engine.search(search_board, max_depth)
+        pv = engine.principal_variation(search_board, best_move, 2)
+
+        # a ponder or infinite search waits for ponderhit or stop before it answers
+        self.release.wait()
+
+        self.send("info string {}".format(engine.stats.summary()))
+        line = "bestmove {}".format(search_board.uci(best_move))
+        if len(pv) > 1:
+            search_board.push(best_move)
+            line += " ponder {}".format(search_board.uci(pv[1]))
+        self.send(line)
+
+    def send_info(self, stats):
+        info = self.engine.info(stats, self.board.turn)
+        score = info["score"].relative
+        score_text = "mate {}".format(score.mate()) if score.is_mate() else "cp {}".format(score.score())
+
+        board = self.board.copy(stack=False)
+        pv = []
+        for move in stats.pv:
+            pv.append(board.uci(move))
+            board.push(move)
+
+        self.send("info depth {} score {} nodes {} nps {} time {} pv {}".format(
+            stats.depth, score_text, stats.total_nodes, stats.nps(), int(info["time"] * 1000), " ".join(pv)))
+
+    def ponderhit(self):
+        if self.search_thread and self.engine:
+            if self.ponder_time is not None:
+                self.engine.clock.ponderhit(self.ponder_time)
+            self.ponder_time = None
+            self.release.set()
+
+    def stop_search(self):
+        if self.search_thread:
+            self.engine.clock.stop()
+            self.release.set()
+            self.search_thread.join()
+            self.search_thread = None
+
+
+def main():
+    uci = UCI(sys.stdout)
+    # the engine reports its progress with print, keep that off the protocol channel
+    sys.stdout = sys.stderr
+    uci.run(sys.stdin)
+
+
+if __name__ == "__main__":
+    main()
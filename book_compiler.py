@@ -0,0 +1,212 @@
+import argparse
+import heapq
+import itertools
+import logging
+import os
+import struct
+import tempfile
+import chess
+import chess.pgn
+import chess.polyglot
+
+logger = logging.getLogger(__name__)
+
+# A polyglot entry: key, move, weight, learn
+ENTRY = struct.Struct(">QHHI")
+# An entry of a sorted run on disk: key, move and the weight before it is scaled to 16 bits
+RUN_ENTRY = struct.Struct(">QHd")
+MAX_WEIGHT = 0xFFFF
+
+DEFAULT_MAX_PLY = 30
+# Weight of a move by the result of the game for the side that played it
+DEFAULT_RESULT_WEIGHTS = {"win": 2, "draw": 1, "loss": 0}
+# Positions in memory before they are written to a sorted run
+DEFAULT_MAX_ENTRIES = 500000
+
+
+def polyglot_move(board, move):
+    """
+    A move in the polyglot encoding, which writes castling as the king taking its own rook
+    """
+    to_square = move.to_square
+    if board.is_castling(move):
+        rank = chess.square_rank(move.from_square)
+        to_square = chess.square(7 if board.is_kingside_castling(move) else 0, rank)
+    promotion = move.promotion - 1 if move.promotion else 0
+    return to_square | move.from_square << 6 | promotion << 12
+
+
+class MainlineVisitor(chess.pgn.BaseVisitor):
+    """
+    Collects the result and the first max_ply moves of the main line, skipping variations and comments,
+    so a game never costs more than max_ply moves of memory
+    """
+    def __init__(self, max_ply=DEFAULT_MAX_PLY):
+        self.max_ply = max_ply
+
+    def begin_game(self):
+        self.headers = {}
+        self.moves = []
+        self.error = False
+
+    def visit_header(self, tagname, tagvalue):
+        self.headers[tagname] = tagvalue
+
+    def begin_variation(self):
+        return chess.pgn.SKIP
+
+    def visit_move(self, board, move):
+        if len(self.moves) < self.max_ply:
+            self.moves.append(move)
+
+    def handle_error(self, error):
+        self.error = True
+
+    def result(self):
+        return self.headers, self.moves, self.error
+
+
+def pgn_paths(paths):
+    """
+    The PGN files among paths, directories like the pgn_directory of lichess-bot are searched for them
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in sorted(os.walk(path)):
+                for name in sorted(files):
+                    if name.endswith(".pgn"):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def game_moves(paths, max_ply=DEFAULT_MAX_PLY):
+    """
+    (board, moves, result) of every standard chess game in the PGN files, one game at a time
+    """
+    for path in pgn_paths(paths):
+        # PGN files from databases are often Latin-1 rather than UTF-8
+        with open(path, encoding="latin-1") as pgn:
+            while True:
+                game = chess.pgn.read_game(pgn, Visitor=lambda: MainlineVisitor(max_ply))
+                if game is None:
+                    break
+                headers, moves, error = game
+                variant = headers.get("Variant", "Standard").lower()
+                if error or variant not in ["standard", "chess", "from position"]:
+                    continue
+                board = chess.Board(headers["FEN"]) if "FEN" in headers else chess.Board()
+                yield board, moves, headers.get("Result", "*")
+
+
+def move_weights(board, moves, result, result_weights, ply_decay):
+    """
+    (key, polyglot move, weight) of every move of a game, weighted by the result for the side that played
+    it and by ply_decay for every ply into the game
+    """
+    if result not in ["1-0", "0-1", "1/2-1/2"]:
+        return
+    for ply, move in enumerate(moves):
+        if result == "1/2-1/2":
+            outcome = "draw"
+        else:
+            outcome = "win" if (result == "1-0") == (board.turn == chess.WHITE) else "loss"
+        weight = result_weights[outcome] * ply_decay ** ply
+        if weight > 0:
+            yield chess.polyglot.zobrist_hash(board), polyglot_move(board, move), weight
+        board.push(move)
+
+
+def write_run(weights, directory):
+    """
+    Write the weights in memory to a sorted run file, returns its path
+    """
+    handle, path = tempfile.mkstemp(suffix=".run", dir=directory)
+    with os.fdopen(handle, "wb") as run:
+        for (key, move), weight in sorted(weights.items()):
+            run.write(RUN_ENTRY.pack(key, move, weight))
+    return path
+
+
+def read_run(path):
+    with open(path, "rb") as run:
+        while True:
+            data = run.read(RUN_ENTRY.size)
+            if not data:
+                break
+            yield RUN_ENTRY.unpack(data)
+
+
+def merged_entries(runs):
+    """
+    (key, move, weight) in key and move order, with the weights of the same move in different runs added up
+    """
+    merged = heapq.merge(*(read_run(path) for path in runs))
+    for (key, move), entries in itertools.groupby(merged, key=lambda entry: entry[:2]):
+        yield key, move, sum(weight for _, _, weight in entries)
+
+
+def compile_book(paths, output, max_ply=DEFAULT_MAX_PLY, result_weights=None, ply_decay=1.0,
+                 max_entries=DEFAULT_MAX_ENTRIES):
+    """
+    Compile the games of the PGN files in paths into a polyglot book at output.
+
+    The moves are counted in memory until max_entries distinct (position, move) pairs are held, then
+    written to a sorted run on disk. The runs are merged at the end, so memory stays bounded however many
+    games there are. Within each position the weights are scaled so the best move gets 65535.
+    Returns the number of games and of entries written.
+    """
+    result_weights = result_weights or DEFAULT_RESULT_WEIGHTS
+    games = 0
+    entries = 0
+
+    with tempfile.TemporaryDirectory() as directory:
+        runs = []
+        weights = {}
+        for board, moves, result in game_moves(paths, max_ply):
+            games += 1
+            for key, move, weight in move_weights(board, moves, result, result_weights, ply_decay):
+                weights[key, move] = weights.get((key, move), 0) + weight
+            if len(weights) >= max_entries:
+                runs.append(write_run(weights, directory))
+                weights = {}
+        if weights:
+            runs.append(write_run(weights, directory))
+        logger.info(f"Read {games} games into {len(runs)} runs")
+
+        with open(output, "wb") as book:
+            for key, position in itertools.groupby(merged_entries(runs), key=lambda entry: entry[0]):
+                position = list(position)
+                best = max(weight for _, _, weight in position)
+                # the strongest move first, readers that take the first entry get the main line
+                for _, move, weight in sorted(position, key=lambda entry: entry[2], reverse=True):
+                    scaled = round(weight * MAX_WEIGHT / best)
+                    if scaled:
+                        book.write(ENTRY.pack(key, move, scaled, 0))
+                        entries += 1
+    return games, entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile PGN files into a polyglot opening book.")
+    parser.add_argument("pgn", nargs="+", help="PGN files, or directories of them like the pgn_directory.")
+    parser.add_argument("--output", "-o", default="engines/book.bin", help="Polyglot book to write.")
+    parser.add_argument("--max-ply", type=int, default=DEFAULT_MAX_PLY, help="Plies of each game in the book.")
+    parser.add_argument("--win", type=float, default=DEFAULT_RESULT_WEIGHTS["win"], help="Weight of a won game.")
+    parser.add_argument("--draw", type=float, default=DEFAULT_RESULT_WEIGHTS["draw"], help="Weight of a drawn game.")
+    parser.add_argument("--loss", type=float, default=DEFAULT_RESULT_WEIGHTS["loss"], help="Weight of a lost game.")
+    parser.add_argument("--ply-decay", type=float, default=1.0,
+                        help="Factor the weight is multiplied with for every ply into the game.")
+    parser.add_argument("--max-entries", type=int, default=DEFAULT_MAX_ENTRIES,
+                        help="Moves held in memory before they are written to disk.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    games, entries = compile_book(args.pgn, args.output, args.max_ply,
+                                  {"win": args.win, "draw": args.draw, "loss": args.loss}, args.ply_decay,
+                                  max_entries=args.max_entries)
+    logger.info(f"Wrote {entries} entries from {games} games to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
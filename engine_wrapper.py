@@ -113,8 +113,9 @@ class EngineWrapper:
             movetime_sec = float(movetime) / 1000
             if time_limit.time is None or time_limit.time > movetime_sec:
                 time_limit.time = movetime_sec
-        time_limit.depth = self.go_commands.get("depth")
-        time_limit.nodes = self.go_commands.get("nodes")
+        # keep the depth and nodes of the limit when go_commands doesn't set them
+        time_limit.depth = self.go_commands.get("depth", time_limit.depth)
+        time_limit.nodes = self.go_commands.get("nodes", time_limit.nodes)
         return time_limit
 
     def offer_draw_or_resign(self, result, board):
@@ -154,6 +155,12 @@ class EngineWrapper:
                                   info=chess.engine.INFO_ALL,
                                   ponder=ponder,
                                   draw_offered=draw_offered)
+        return self.process_playresult(board, result)
+
+    def process_playresult(self, board, result):
+        """
+        Keep the info of a search result for the stats, chat and PGN comments, and decide on draws and resigns
+        """
         self.last_move_info = result.info.copy()
         self.move_commentary.append(self.last_move_info.copy())
         if self.comment_start_index is None:
@@ -260,6 +267,12 @@ class EngineWrapper:
     def stop(self):
         pass
 
+    def caches(self):
+        """
+        The caches of a homemade engine by name, for the memory report of the profiler
+        """
+        return {}
+
     def quit(self):
         self.engine.quit()
         self.engine.close()
@@ -336,5 +349,10 @@ class XBoardEngine(EngineWrapper):
 
 
 def getHomemadeEngine(name):
+    # a dotted name is a class in another module, e.g. engines.ScoreEngine.ScoreEngine
+    if "." in name:
+        import importlib
+        module_name, class_name = name.rsplit(".", 1)
+        return getattr(importlib.import_module(module_name), class_name)
     import strategies
     return getattr(strategies, name)
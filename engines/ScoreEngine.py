@@ -1,9 +1,18 @@
 import chess
-import random
+import chess.engine
+import logging
+import multiprocessing
+import sys
+import time
 
 from chess.engine import PlayResult
 
 from strategies import MinimalEngine
+from MyEngines.AttackMaps import attack_maps, space_control, threatened_pieces
+from MyEngines.BatchEvaluation import evaluate_children, piece_weights
+from MyEngines.SearchClock import move_time
+from MyEngines.StaticExchange import see
+from MyEngines.UCI import go_time_limit, parse_go, parse_option, parse_position
 
 PIECE_VALUES = {
     'K': 10,
@@ -14,6 +23,11 @@ PIECE_VALUES = {
     'P': 1
 }
 
+logger = logging.getLogger(__name__)
+
+MATERIAL_WEIGHTS = piece_weights({chess.PIECE_SYMBOLS.index(symbol.lower()): value
+                                  for symbol, value in PIECE_VALUES.items()})
+
 
 def material_count(new_board, turn):
     # count material in the new position
@@ -28,61 +42,206 @@ def material_count(new_board, turn):
     return material_diff
 
 
-def improved_score(new_board, turn):
-    score = material_count(new_board, turn)
+def improved_score(new_board, turn, material=None):
+    score = material_count(new_board, turn) if material is None else material
 
     # If there is a checkmate possible increase the  score
     if new_board.is_checkmate():
         score += 999999
 
     # Compute space controlled by current color
-    space = 0
-    for square in chess.SQUARES:
-        if new_board.is_attacked_by(turn, square):
-            space += 1
-        if new_board.is_attacked_by(not turn, square):
-            space -= 1
-
-    score += space * 1 / 32
+    own_maps = attack_maps(new_board, turn)
+    their_maps = attack_maps(new_board, not turn)
 
-    # Remove hanging pieces from material count
-    all_pieces = new_board.piece_map().items()
+    score += space_control(own_maps, their_maps) * 1 / 32
 
-    for square, piece in all_pieces:
-        if piece.color == turn:
-            attack_count = len(new_board.attackers(not turn, square))
-            defender_count = len(new_board.attackers(turn, square))
-            if attack_count > defender_count:
-                score -= PIECE_VALUES[piece.symbol().upper()]
+    # Remove what the opponent wins by capturing hanging pieces from material count
+    for square in chess.scan_forward(threatened_pieces(new_board, turn, own_maps, their_maps)):
+        loss = max(see(new_board, chess.Move(attacker, square))
+                   for attacker in new_board.attackers(not turn, square))
+        if loss > 0:
+            score -= loss / 100
 
     return score
 
 
+def score_moves(board, moves, score_function=improved_score, deadline=None):
+    """
+    Score the position after each of moves for the side to move, stops early once deadline (time.time()) passes
+    """
+    turn = board.turn
+    scored_moves = []
+
+    # Count the material after every move in one batched call
+    materials = evaluate_children(board, moves, MATERIAL_WEIGHTS)
+
+    # Loop through each legal move
+    for move, material in zip(moves, materials):
+
+        # Preform the move, score the position and take the move back
+        board.push(move)
+        score = score_function(board, turn, material)
+        board.pop()
+
+        scored_moves.append((score, move))
+
+        if deadline is not None and time.time() > deadline:
+            break
+
+    return scored_moves
+
+
+def score_chunk(fen, chess960, moves, deadline):
+    """
+    Worker side of the root split, the position comes in as a FEN and the moves as UCI strings
+    """
+    board = chess.Board(fen, chess960=chess960)
+    scored_moves = score_moves(board, [chess.Move.from_uci(move) for move in moves], deadline=deadline)
+    return [(score, move.uci()) for score, move in scored_moves]
+
+
+def move_deadline(board, time_limit):
+    """
+    Wall clock time by which the move has to be chosen, None if the limit has no time in it
+    """
+    if time_limit.time is not None:
+        return time.time() + time_limit.time
+    clock = time_limit.white_clock if board.turn == chess.WHITE else time_limit.black_clock
+    if clock is None:
+        return None
+    increment = (time_limit.white_inc if board.turn == chess.WHITE else time_limit.black_inc) or 0
+    return time.time() + move_time(clock, increment, time_limit.remaining_moves)
+
+
 class ScoreEngine(MinimalEngine):
-    def __init__(self, *args, name=None):
-        super().__init__(*args)
+    """
+    Scores every legal move one ply deep and plays the best one.
+
+    With the `Workers` option above one the root moves are split across a
+    process pool. Only the FEN and the moves as UCI strings are sent to the
+    workers, not pickled boards. The processes lichess-bot, tournament.py
+    and epd_runner.py play in are daemonic and can't start a pool, run the
+    engine as a UCI engine through the engines/ScoreEngineUCI launcher to
+    use the workers there.
+    """
+    def __init__(self, *args, name=None, **popen_args):
+        super().__init__(*args, name, **popen_args)
         self.name = name
         self.score_function = improved_score
 
+        options = args[1] if len(args) > 1 else {}
+        self.workers = options.get("Workers", 1)
+        self.pool = None
+        if self.workers > 1:
+            if multiprocessing.current_process().daemon:
+                logger.warning(f"{self.workers} Workers were asked for, but the engine runs in a daemonic process "
+                               "that can't start them, searching in one process. Run engines/ScoreEngineUCI as a "
+                               "UCI engine to use them.")
+            else:
+                self.pool = multiprocessing.Pool(self.workers)
+
     def search(self, board, time_limit, ponder, draw_offered):
         # Make a list of all legal moves
         moves = list(board.legal_moves)
+        deadline = move_deadline(board, time_limit)
+
+        if self.pool and self.score_function is improved_score and len(moves) > self.workers:
+            scored_moves = self.split_search(board, moves, deadline)
+        else:
+            scored_moves = score_moves(board, moves, self.score_function, deadline)
 
         best_move = None
         best_score = -float('inf')
-
-        # Loop through each legal move
-        for move in moves:
-
-            # Copy the board and preform a move on copy of board
-            new_board = board.copy()
-            new_board.push(move)
-
-            # Call the score function
-            score = self.score_function(new_board, board.turn)
-
+        for score, move in scored_moves:
             if score > best_score:
                 best_move = move
                 best_score = score
 
-        return PlayResult(best_move)
+        return PlayResult(best_move, None)
+
+    def split_search(self, board, moves, deadline):
+        """
+        Score the moves in the pool, each worker gets every n-th move so captures and quiet moves spread evenly
+        """
+        fen = board.fen()
+        chunks = [[move.uci() for move in moves[index::self.workers]] for index in range(self.workers)]
+        results = [self.pool.apply_async(score_chunk, (fen, board.chess960, chunk, deadline)) for chunk in chunks]
+
+        scored_moves = []
+        for result in results:
+            timeout = None if deadline is None else max(deadline - time.time(), 0)
+            try:
+                scored_moves.extend((score, chess.Move.from_uci(move)) for score, move in result.get(timeout))
+            except multiprocessing.TimeoutError:
+                pass
+
+        # out of time before any worker answered, play the first move rather than nothing
+        if not scored_moves:
+            return [(0, moves[0])]
+
+        # back in the order of moves, so ties are broken the same way as without the pool
+        order = {move: index for index, move in enumerate(moves)}
+        return sorted(scored_moves, key=lambda scored_move: order[scored_move[1]])
+
+    def quit(self):
+        if self.pool:
+            self.pool.terminate()
+            self.pool = None
+        super().quit()
+
+
+MAX_WORKERS = 64
+
+
+def uci(lines=sys.stdin, output=sys.stdout):
+    """
+    Minimal UCI loop around ScoreEngine. Run as a UCI engine the engine is a process of its own rather than a
+    daemonic game worker, so the Workers option can start its pool. The commands are parsed as in MyEngines.UCI,
+    but a one-ply search ends well within its deadline, so it runs on the command thread and stop has nothing to
+    interrupt.
+    """
+    def send(line):
+        output.write(line + "\n")
+        output.flush()
+
+    options = {"Workers": 1}
+    engine = None
+    board = chess.Board()
+    for line in lines:
+        tokens = line.split()
+        if not tokens:
+            continue
+        command = tokens[0]
+        if command == "uci":
+            send("id name ScoreEngine")
+            send("id author ExoHumann")
+            send(f"option name Workers type spin default 1 min 1 max {MAX_WORKERS}")
+            send("uciok")
+        elif command == "setoption":
+            name, value = parse_option(tokens[1:])
+            if name == "workers" and value is not None:
+                options["Workers"] = min(max(int(value), 1), MAX_WORKERS)
+                if engine:
+                    engine.quit()
+                    engine = None
+        elif command == "isready":
+            engine = engine or ScoreEngine(None, dict(options), None, None)
+            send("readyok")
+        elif command == "ucinewgame":
+            board = chess.Board()
+        elif command == "position":
+            if len(tokens) > 1:
+                board = parse_position(tokens[1:])
+        elif command == "go":
+            engine = engine or ScoreEngine(None, dict(options), None, None)
+            time_limit = go_time_limit(parse_go(tokens[1:]), board.turn)
+            limit = chess.engine.Limit(time=None if time_limit is None else time_limit / 1000)
+            result = engine.search(board, limit, False, False)
+            send(f"bestmove {result.move.uci() if result.move else '0000'}")
+        elif command == "stop":
+            # the search above has already answered
+            pass
+        elif command == "quit":
+            break
+    if engine:
+        engine.quit()
@@ -0,0 +1,136 @@
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+import time
+import chess
+import chess.engine
+from config import load_config
+from engine_wrapper import create_engine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMES = [0.1, 0.5, 1.0, 2.0]
+
+
+def load_epd(path):
+    """
+    (name, epd, best moves, avoid moves) of every position in an EPD file with a bm or am operation.
+    Moves are returned as UCI strings, so the positions can be sent to the worker processes as they are.
+    """
+    positions = []
+    with open(path) as epd_file:
+        for line_number, line in enumerate(epd_file, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            board, operations = chess.Board.from_epd(line)
+            best_moves = [move.uci() for move in operations.get("bm", [])]
+            avoid_moves = [move.uci() for move in operations.get("am", [])]
+            if not best_moves and not avoid_moves:
+                logger.warning(f"Skipping line {line_number} of {path}, it has no bm or am.")
+                continue
+            name = operations.get("id") or f"{os.path.basename(path)}:{line_number}"
+            positions.append((name, board.epd(), best_moves, avoid_moves))
+    return positions
+
+
+def is_solved(move, best_moves, avoid_moves):
+    return (not best_moves or move in best_moves) and move not in avoid_moves
+
+
+def make_limit(kind, value):
+    if kind == "nodes":
+        return chess.engine.Limit(nodes=int(value))
+    if kind == "depth":
+        return chess.engine.Limit(depth=int(value))
+    return chess.engine.Limit(time=value)
+
+
+def init_worker():
+    # homemade engines report their search with print, which would interleave between the workers
+    sys.stdout = open(os.devnull, "w")
+
+
+def solve(task):
+    """
+    Search one position with one limit in a fresh engine, so no search profits from the table of another
+    """
+    config, (name, epd, best_moves, avoid_moves), kind, value = task
+    board = chess.Board()
+    board.set_epd(epd)
+    engine = create_engine(config)
+    try:
+        start = time.perf_counter()
+        result = engine.search(board, make_limit(kind, value), False, False)
+        seconds = time.perf_counter() - start
+    finally:
+        engine.quit()
+    move = result.move.uci() if result.move else None
+    return name, value, move, is_solved(move, best_moves, avoid_moves), seconds
+
+
+def run(config, positions, kind="time", values=DEFAULT_TIMES, workers=None):
+    """
+    Search every position at every limit in a process pool.
+    Returns {limit value: {position name: (move, solved, seconds)}}.
+    """
+    tasks = [(config, position, kind, value) for value in values for position in positions]
+    # the longest searches first, so the pool isn't left waiting on them at the end
+    tasks.sort(key=lambda task: task[3], reverse=True)
+
+    results = {value: {} for value in values}
+    with multiprocessing.Pool(workers, initializer=init_worker) as pool:
+        for name, value, move, solved, seconds in pool.imap_unordered(solve, tasks):
+            results[value][name] = (move, solved, seconds)
+    return results
+
+
+def report(positions, results, kind="time", output=sys.stdout):
+    unit = {"time": "s", "nodes": " nodes", "depth": " plies"}[kind]
+    values = sorted(results)
+    print(f"{'position':<16}" + "".join(f"{str(value) + unit:>14}" for value in values), file=output)
+    for name, epd, best_moves, avoid_moves in positions:
+        cells = []
+        for value in values:
+            move, solved, _ = results[value][name]
+            cells.append(f"{(move or '-') + (' ok' if solved else ' --'):>14}")
+        print(f"{name:<16}" + "".join(cells), file=output)
+
+    print(file=output)
+    for value in values:
+        solved = sum(solved for _, solved, _ in results[value].values())
+        print(f"{str(value) + unit:>14}: {solved}/{len(positions)} solved", file=output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run an EPD test suite against the engine of a config file.")
+    parser.add_argument("epd", nargs="+", help="EPD files with bm or am operations.")
+    parser.add_argument("--config", default="./config.yml",
+                        help="Config file with the engine to test (defaults to ./config.yml).")
+    limits = parser.add_mutually_exclusive_group()
+    limits.add_argument("--times", type=float, nargs="+", default=DEFAULT_TIMES,
+                        help="Seconds per position, the suite is run once for every value.")
+    limits.add_argument("--nodes", type=int, nargs="+", help="Node limits per position instead of times.")
+    limits.add_argument("--depth", type=int, nargs="+", help="Depth limits per position instead of times.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of engines searching at once.")
+    args = parser.parse_args()
+
+    logging.basicConfig()
+    config = load_config(args.config)
+    positions = [position for path in args.epd for position in load_epd(path)]
+
+    if args.nodes:
+        kind, values = "nodes", args.nodes
+    elif args.depth:
+        kind, values = "depth", args.depth
+    else:
+        kind, values = "time", args.times
+
+    results = run(config, positions, kind, values, args.workers)
+    report(positions, results, kind)
+
+
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,7 @@ import io
 import copy
 from config import load_config
 from conversation import Conversation, ChatLine
+from profiling import GameProfiler
 from timer import Timer
 from requests.exceptions import ChunkedEncodingError, ConnectionError, HTTPError, ReadTimeout
 from rich.logging import RichHandler
@@ -341,7 +342,10 @@ def play_game(li,
     abort_time = config.get("abort_time", 20)
     game = model.Game(initial_state, user_profile["username"], li.baseUrl, abort_time)
 
+    # started before the engine, so tracemalloc sees its caches being allocated
+    profiler = GameProfiler(config.get("profiling") or {}, game_id)
     engine = engine_wrapper.create_engine(config)
+    profiler.wrap_engine(engine)
     engine.get_opponent_info(game)
     conversation = Conversation(game, engine, li, __version__, challenge_queue)
 
@@ -392,6 +396,7 @@ def play_game(li,
             if u_type == "chatLine":
                 conversation.react(ChatLine(upd), game)
             elif u_type == "gameState":
+                profiler.start_iteration()
                 game.state = upd
                 board = setup_board(game)
                 if len(board.move_stack) == 0:
@@ -458,6 +463,7 @@ def play_game(li,
                 terminate_time = (upd[f"{wb}time"] + upd[f"{wb}inc"]) / 1000 + 60
                 game.ping(abort_time, terminate_time, disconnect_time)
                 prior_game = copy.deepcopy(game)
+                profiler.stop_iteration()
             elif u_type == "ping":
                 if (is_correspondence
                         and not is_engine_move(game, prior_game, board)
@@ -480,6 +486,11 @@ def play_game(li,
         except StopIteration:
             break
 
+    try:
+        profiler.finish(engine)
+    except Exception:
+        logger.exception("Error writing profiles:")
+
     engine.stop()
     engine.quit()
 
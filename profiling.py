@@ -0,0 +1,206 @@
+import cProfile
+import contextlib
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two samples of the sampling profiler
+DEFAULT_SAMPLE_INTERVAL = 0.005
+# Lines of the tracemalloc statistics written per game
+MEMORY_TOP_LINES = 25
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of all other threads at a fixed interval and counts them in collapsed stack form,
+    `frame;frame;frame count`, which flamegraph.pl and speedscope read directly.
+
+    Unlike cProfile the profiled code runs at full speed, the only cost is
+    the sampling thread taking the GIL once every interval.
+    """
+    def __init__(self, interval=DEFAULT_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self.thread = None
+        self.stopped = threading.Event()
+
+    def enable(self):
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.sample, daemon=True)
+        self.thread.start()
+
+    def disable(self):
+        self.stopped.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    def sample(self):
+        own_id = threading.get_ident()
+        while not self.stopped.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def write(self, path):
+        with open(path, "w") as collapsed:
+            for stack, count in self.stacks.most_common():
+                collapsed.write(f"{stack} {count}\n")
+
+
+def cache_size(cache):
+    """
+    Bytes held by a cache, the container and one level of its contents
+    """
+    if isinstance(cache, memoryview):
+        # a table in shared memory
+        return cache.nbytes
+    size = sys.getsizeof(cache)
+    if isinstance(cache, dict):
+        size += sum(sys.getsizeof(key) + sys.getsizeof(value) for key, value in cache.items())
+    elif isinstance(cache, (list, tuple)):
+        size += sum(cache_size(item) if isinstance(item, (list, tuple)) else sys.getsizeof(item) for item in cache)
+    return size
+
+
+class GameProfiler:
+    """
+    Profiles the first `searches` engine searches and the first `iterations` game states of a game, as set
+    in the `profiling` section of the config. The results go to `<directory>/<game id>/`:
+    - search.pstats and loop.pstats with cProfile, for pstats or snakeviz
+    - search.collapsed and loop.collapsed with the sampling profiler, for flame graphs
+    - memory.txt and memory.snapshot with `tracemalloc: true`, the biggest allocations and the size of
+      the engine caches, and the snapshot itself to compare with tracemalloc.Snapshot.load
+
+    A search inside a profiled game state is part of the loop profile, the two
+    profilers of the same kind can't run at once.
+    """
+    def __init__(self, profiling_cfg, game_id):
+        self.enabled = profiling_cfg.get("enabled", False)
+        self.kind = profiling_cfg.get("profiler", "cprofile")
+        self.searches_left = profiling_cfg.get("searches", 10)
+        self.iterations_left = profiling_cfg.get("iterations", 0)
+        self.sample_interval = profiling_cfg.get("sample_interval", DEFAULT_SAMPLE_INTERVAL)
+        self.use_tracemalloc = self.enabled and profiling_cfg.get("tracemalloc", False)
+        self.directory = os.path.join(profiling_cfg.get("directory", "profiles"), game_id)
+        self.profilers = {}
+        self.active = False
+        # the loop profiler while a game state is being profiled
+        self.iteration = None
+
+        self.started_tracemalloc = self.use_tracemalloc and not tracemalloc.is_tracing()
+        if self.started_tracemalloc:
+            tracemalloc.start()
+
+    def new_profiler(self):
+        if self.kind == "sampling":
+            return SamplingProfiler(self.sample_interval)
+        return cProfile.Profile()
+
+    def start(self, name):
+        """
+        Start the profiler called name, unless another one is running. Returns the profiler to stop.
+        """
+        if self.active:
+            return None
+        profiler = self.profilers.get(name)
+        if profiler is None:
+            profiler = self.profilers[name] = self.new_profiler()
+        self.active = True
+        profiler.enable()
+        return profiler
+
+    def stop(self, profiler):
+        if profiler is not None:
+            profiler.disable()
+            self.active = False
+
+    @contextlib.contextmanager
+    def profile(self, name):
+        """
+        Profile the block into the profiler called name, unless another block is being profiled
+        """
+        profiler = self.start(name)
+        try:
+            yield
+        finally:
+            self.stop(profiler)
+
+    def wrap_engine(self, engine):
+        """
+        Profile the first searches of engine, lichess-bot reaches every search through engine.search
+        """
+        if not self.enabled or not self.searches_left:
+            return
+        search = engine.search
+
+        def profiled_search(*args, **kwargs):
+            if self.searches_left <= 0:
+                return search(*args, **kwargs)
+            self.searches_left -= 1
+            with self.profile("search"):
+                return search(*args, **kwargs)
+
+        engine.search = profiled_search
+
+    def start_iteration(self):
+        """
+        Called when lichess-bot starts handling a game state, stop_iteration when it is done
+        """
+        if not self.enabled or self.iterations_left <= 0 or self.iteration is not None:
+            return
+        self.iterations_left -= 1
+        self.iteration = self.start("loop")
+
+    def stop_iteration(self):
+        self.stop(self.iteration)
+        self.iteration = None
+
+    def finish(self, engine):
+        """
+        Write the profiles and the memory report of the game
+        """
+        if not self.enabled:
+            return
+        # a game state whose handling was cut short by an error
+        self.stop_iteration()
+        os.makedirs(self.directory, exist_ok=True)
+        for name, profiler in self.profilers.items():
+            if isinstance(profiler, SamplingProfiler):
+                profiler.write(os.path.join(self.directory, f"{name}.collapsed"))
+            else:
+                profiler.dump_stats(os.path.join(self.directory, f"{name}.pstats"))
+
+        if self.use_tracemalloc:
+            self.write_memory(engine)
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+        logger.info(f"Wrote profiles to {self.directory}")
+
+    def write_memory(self, engine):
+        snapshot = tracemalloc.take_snapshot()
+        snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+        snapshot.dump(os.path.join(self.directory, "memory.snapshot"))
+        current, peak = tracemalloc.get_traced_memory()
+        with open(os.path.join(self.directory, "memory.txt"), "w") as memory:
+            memory.write(f"traced {current} bytes, peak {peak} bytes, at {time.strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+            memory.write("engine caches:\n")
+            for name, cache in engine.caches().items():
+                memory.write(f"{name}: {cache_size(cache)} bytes\n")
+            memory.write("\nbiggest allocations:\n")
+            for statistic in snapshot.statistics("lineno")[:MEMORY_TOP_LINES]:
+                memory.write(f"{statistic}\n")
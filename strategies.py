@@ -3,9 +3,15 @@ Some example strategies for people who want to create a custom, homemade bot.
 And some handy classes to extend
 """
 
+import chess
 from chess.engine import PlayResult
 import random
 from engine_wrapper import EngineWrapper
+import MyEngines.Evaluation
+import MyEngines.RandomMoveEngine
+import MyEngines.ScoreEngine
+import MyEngines.SearchClock
+from MyEngines.TranspositionTable import DEFAULT_HASH_MB
 
 
 class FillerEngine:
@@ -101,3 +107,56 @@ class FirstMove(ExampleEngine):
         moves = list(board.legal_moves)
         moves.sort(key=str)
         return PlayResult(moves[0], None)
+
+
+class RandomMoveEngine(ExampleEngine):
+    """Runs MyEngines.RandomMoveEngine as a homemade engine"""
+    def __init__(self, commands, options, stderr, draw_or_resign, name=None, **popen_args):
+        super().__init__(commands, options, stderr, draw_or_resign, name, **popen_args)
+        self.random_engine = MyEngines.RandomMoveEngine.RandomMoveEngine()
+
+    def search(self, board, *args):
+        return PlayResult(self.random_engine.play(board, None, False), None)
+
+
+class ScoreEngine(ExampleEngine):
+    """
+    Runs MyEngines.ScoreEngine as a homemade engine
+
+    `homemade_options` are passed to the engine, e.g. `Hash` sets the size
+    of the transposition table in megabytes and `Threads` the number of
+    processes searching each move. `NullMove`, `LateMoveReductions`,
+    `ReverseFutility`, `Futility` and `CheckExtensions` switch the parts of
+    the selective search on or off.
+    """
+    def __init__(self, commands, options, stderr, draw_or_resign, name=None, **popen_args):
+        super().__init__(commands, options, stderr, draw_or_resign, name, **popen_args)
+        pruning = {name: options[name] for name in MyEngines.ScoreEngine.PRUNING_OPTIONS if name in options}
+        self.score_engine = MyEngines.ScoreEngine.ScoreEngine(hash_size=options.get("Hash", DEFAULT_HASH_MB),
+                                                              threads=options.get("Threads", 1),
+                                                              pruning=pruning)
+
+    def search(self, board, time_limit, ponder, draw_offered):
+        clock = time_limit.white_clock if board.turn == chess.WHITE else time_limit.black_clock
+        if time_limit.time is not None:
+            move_time = time_limit.time
+        elif clock is not None:
+            increment = time_limit.white_inc if board.turn == chess.WHITE else time_limit.black_inc
+            move_time = MyEngines.SearchClock.move_time(clock, increment)
+        else:
+            # only a node or depth limit
+            move_time = None
+        best_move = self.score_engine.play(board.copy(), None if move_time is None else move_time * 1000, ponder,
+                                           time_limit.nodes, time_limit.depth)
+        info = self.score_engine.info(self.score_engine.last_stats, board.turn)
+        return self.process_playresult(board, PlayResult(best_move, None, info))
+
+    def caches(self):
+        return {"transposition_table": self.score_engine.transposition_table.table,
+                "killers": self.score_engine.move_orderer.killers,
+                "history": self.score_engine.move_orderer.history,
+                "pawn_cache": MyEngines.Evaluation.pawn_cache}
+
+    def quit(self):
+        self.score_engine.quit()
+        super().quit()
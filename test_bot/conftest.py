@@ -3,8 +3,9 @@ import os
 
 
 def pytest_sessionfinish(session, exitstatus):
-    shutil.copyfile("correct_lichess.py", "lichess.py")
-    os.remove("correct_lichess.py")
+    if os.path.exists("correct_lichess.py"):
+        shutil.copyfile("correct_lichess.py", "lichess.py")
+        os.remove("correct_lichess.py")
     if os.path.exists("TEMP"):
         shutil.rmtree("TEMP")
     if os.path.exists("logs"):
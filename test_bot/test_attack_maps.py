@@ -0,0 +1,26 @@
+import random
+import chess
+import pytest
+from MyEngines.AttackMaps import attack_maps, threatened_pieces
+from test_bot.test_search_board import random_walk, start_positions
+
+
+@pytest.mark.parametrize("fen,chess960", list(start_positions()))
+def test_attack_maps_match_is_attacked_by(fen, chess960):
+    rng = random.Random(fen)
+    for board in random_walk(chess.Board(fen, chess960=chess960), rng):
+        for color in chess.COLORS:
+            attacked = 0
+            for square in chess.SQUARES:
+                if board.is_attacked_by(color, square):
+                    attacked |= chess.BB_SQUARES[square]
+            assert attack_maps(board, color)[0] == attacked
+
+
+def test_threatened_pieces():
+    # the rook on d4 is defended but attacked by the knight on c6, the knight on h5 is attacked by the rook on h8
+    # and undefended, the knight on f3 is attacked by the queen on f8 but defended by the king
+    board = chess.Board("5qkr/8/2n5/7N/3R4/4KN2/8/8 w - - 0 1")
+    own_maps = attack_maps(board, chess.WHITE)
+    their_maps = attack_maps(board, chess.BLACK)
+    assert threatened_pieces(board, chess.WHITE, own_maps, their_maps) == chess.BB_D4 | chess.BB_H5
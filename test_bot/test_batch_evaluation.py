@@ -0,0 +1,34 @@
+import random
+import chess
+import numpy as np
+import pytest
+from MyEngines.BatchEvaluation import MATERIAL_PST_WEIGHTS, child_placements, evaluate_children, placements
+from test_bot.test_search_board import random_walk, start_positions
+
+
+@pytest.mark.parametrize("fen,chess960", list(start_positions()))
+def test_child_placements_match_push(fen, chess960):
+    rng = random.Random(fen)
+    for board in random_walk(chess.Board(fen, chess960=chess960), rng):
+        moves = list(board.legal_moves)
+        children = child_placements(board, moves)
+        assert children.shape == (len(moves), 12, 64)
+        for move, child in zip(moves, children):
+            board.push(move)
+            assert np.array_equal(child, placements(board)), move
+            board.pop()
+
+
+@pytest.mark.parametrize("fen", ["r1n1k3/1P6/8/8/8/8/8/4K3 w - - 0 1",
+                                 "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 b kq - 0 1"])
+def test_evaluate_children_with_promotions(fen):
+    board = chess.Board(fen)
+    moves = list(board.legal_moves)
+    assert any(move.promotion for move in moves)
+    sign = 1 if board.turn == chess.WHITE else -1
+    expected = []
+    for move in moves:
+        board.push(move)
+        expected.append(sign * int((placements(board) * MATERIAL_PST_WEIGHTS).sum()))
+        board.pop()
+    assert evaluate_children(board, moves).tolist() == expected
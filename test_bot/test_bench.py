@@ -0,0 +1,26 @@
+import chess
+from MyEngines.Bench import BENCH_POSITIONS, DEFAULT_PGN, compare, game_positions, run
+
+
+def test_game_positions():
+    positions = game_positions(DEFAULT_PGN, games=3)
+    assert len(positions) == 3
+    for name, fen in positions:
+        assert chess.Board(fen).is_valid()
+
+
+def test_compare_with_itself():
+    report = run(BENCH_POSITIONS[:2], depth=2, nodes=2000, output=None)
+    assert [result["mode"] for result in report["results"]] == ["depth", "nodes", "depth", "nodes"]
+    assert compare(report, report) == ([], [])
+
+
+def test_compare_regressions():
+    baseline = {"total": {"nps": 1000},
+                "results": [{"name": "a", "mode": "depth", "depth": 4, "nodes": 1000, "move": "e2e4"}]}
+    report = {"total": {"nps": 800},
+              "results": [{"name": "a", "mode": "depth", "depth": 4, "nodes": 1200, "move": "d2d4"}]}
+    regressions, notes = compare(report, baseline, tolerance=0.1)
+    assert len(regressions) == 2
+    assert notes == ["a depth: plays d2d4, was e2e4"]
+    assert compare(report, baseline, tolerance=0.5) == ([], notes)
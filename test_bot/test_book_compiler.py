@@ -0,0 +1,69 @@
+import chess
+import chess.polyglot
+import book_compiler
+
+GAMES = """[Event "1"]
+[Result "1-0"]
+
+1. e4 e5 2. Nf3 Nc6 3. Bb5 Nf6 4. O-O 1-0
+
+[Event "2"]
+[Result "1/2-1/2"]
+
+1. e4 (1. d4 d5) e5 2. Nf3 Nf6 1/2-1/2
+
+[Event "3"]
+[Result "0-1"]
+
+1. d4 d5 2. c4 e6 0-1
+
+[Event "4"]
+[Result "*"]
+
+1. c4 *
+"""
+
+
+def compile_games(tmp_path, **kwargs):
+    pgn = tmp_path / "games.pgn"
+    pgn.write_text(GAMES)
+    book = tmp_path / "book.bin"
+    games, entries = book_compiler.compile_book([str(pgn)], str(book), **kwargs)
+    return games, entries, book
+
+
+def book_moves(book, board):
+    with chess.polyglot.open_reader(str(book)) as reader:
+        return {board.san(entry.move): entry.weight for entry in reader.find_all(board)}
+
+
+def test_compile_book(tmp_path):
+    games, entries, book = compile_games(tmp_path)
+    assert games == 4
+    board = chess.Board()
+    # e4 won once and drew once, d4 lost once, the variation and the unfinished game are left out
+    assert book_moves(book, board) == {"e4": 65535}
+    board.push_san("e4")
+    assert book_moves(book, board) == {"e5": 65535}
+    for san in ["e5", "Nf3", "Nc6", "Bb5", "Nf6"]:
+        board.push_san(san)
+    assert book_moves(book, board) == {"O-O": 65535}
+    board = chess.Board()
+    board.push_san("d4")
+    assert book_moves(book, board) == {"d5": 65535}
+
+
+def test_weights(tmp_path):
+    _, _, book = compile_games(tmp_path, result_weights={"win": 3, "draw": 1, "loss": 1})
+    board = chess.Board()
+    assert book_moves(book, board) == {"e4": 65535, "d4": round(65535 / 4)}
+
+
+def test_runs_merge_like_memory(tmp_path):
+    _, entries, book = compile_games(tmp_path)
+    data = book.read_bytes()
+    _, spilled_entries, spilled_book = compile_games(tmp_path, max_entries=2)
+    assert spilled_entries == entries
+    assert spilled_book.read_bytes() == data
+    keys = [int.from_bytes(data[index:index + 8], "big") for index in range(0, len(data), 16)]
+    assert keys == sorted(keys)
@@ -0,0 +1,31 @@
+import epd_runner
+
+WAC = "EPD/wac.epd"
+HOMEMADE = {"engine": {"dir": "MyEngines", "name": "ScoreEngine", "protocol": "homemade",
+                       "homemade_options": {"Hash": 1}}}
+
+
+def test_load_epd():
+    positions = epd_runner.load_epd(WAC)
+    assert len(positions) == 10
+    name, epd, best_moves, avoid_moves = positions[0]
+    assert name == "WAC.001"
+    assert best_moves == ["g3g6"]
+    assert avoid_moves == []
+
+
+def test_is_solved():
+    assert epd_runner.is_solved("g3g6", ["g3g6"], [])
+    assert not epd_runner.is_solved("e5c6", ["g3g6"], [])
+    assert epd_runner.is_solved("e5c6", [], ["g3g6"])
+    assert not epd_runner.is_solved("g3g6", [], ["g3g6"])
+
+
+def test_run_homemade():
+    positions = epd_runner.load_epd(WAC)[2:4]
+    results = epd_runner.run(HOMEMADE, positions, "depth", [1, 3], workers=2)
+    assert set(results) == {1, 3}
+    for value in results:
+        assert set(results[value]) == {"WAC.003", "WAC.004"}
+    # Rg3 and Qxh7+ are found at depth 3
+    assert all(solved for move, solved, seconds in results[3].values())
@@ -0,0 +1,52 @@
+import io
+import os
+import sys
+import chess
+import chess.engine
+import pytest
+from engines.ScoreEngine import ScoreEngine, score_moves, uci
+
+LAUNCHER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "engines", "ScoreEngineUCI")
+
+FENS = [
+    chess.STARTING_FEN,
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+]
+
+
+@pytest.mark.parametrize("fen", FENS)
+def test_split_search_matches_serial(fen):
+    engine = ScoreEngine(None, {"Workers": 2}, None, None)
+    try:
+        assert engine.pool is not None
+        board = chess.Board(fen)
+        moves = list(board.legal_moves)
+        assert engine.split_search(board, moves, None) == score_moves(board, moves)
+        assert engine.search(board, chess.engine.Limit(), False, False).move == max(
+            score_moves(board, moves), key=lambda scored_move: scored_move[0])[1]
+    finally:
+        engine.quit()
+
+
+def test_uci_launcher():
+    engine = chess.engine.SimpleEngine.popen_uci([sys.executable, LAUNCHER])
+    try:
+        engine.configure({"Workers": 2})
+        board = chess.Board(FENS[1])
+        result = engine.play(board, chess.engine.Limit(time=5))
+        assert result.move in board.legal_moves
+    finally:
+        engine.quit()
+
+
+def test_uci_loop():
+    output = io.StringIO()
+    uci(["uci", "ucinewgame", "position startpos moves e2e4 e7e5", "go wtime 10000 btime 10000 movestogo 20",
+         "stop", "ucinewgame", "position fen " + FENS[1], "go movetime 1000", "quit"], output)
+    answers = [line.split()[1] for line in output.getvalue().splitlines() if line.startswith("bestmove")]
+    board = chess.Board()
+    board.push_uci("e2e4")
+    board.push_uci("e7e5")
+    assert chess.Move.from_uci(answers[0]) in board.legal_moves
+    assert chess.Move.from_uci(answers[1]) in chess.Board(FENS[1]).legal_moves
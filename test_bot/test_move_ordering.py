@@ -0,0 +1,50 @@
+import random
+import chess
+import pytest
+from MyEngines.MoveOrdering import MoveOrderer
+from MyEngines.Perft import PERFT_POSITIONS
+from MyEngines.SearchBoard import SearchBoard
+
+
+def positions(rng, games=5, plies=60):
+    for _, fen, chess960, _ in PERFT_POSITIONS:
+        for _ in range(games):
+            board = SearchBoard(fen, chess960=chess960)
+            for _ in range(plies):
+                moves = list(board.legal_moves)
+                if not moves:
+                    break
+                yield board
+                board.push(rng.choice(moves))
+
+
+def test_staged_moves_yield_every_legal_move_once():
+    rng = random.Random(0)
+    orderer = MoveOrderer()
+    other_moves = [chess.Move.from_uci(move) for move in ["e2e4", "g1f3", "e1g1", "a7a8q", "d5c6"]]
+    for board in positions(rng):
+        legal_moves = list(board.legal_moves)
+        hash_move = rng.choice(legal_moves + other_moves + [None])
+        # killers from elsewhere in the tree, legal or not
+        orderer.killers[3] = [rng.choice(legal_moves + other_moves), rng.choice(other_moves + [None])]
+        fen = board.fen()
+
+        staged = list(orderer.staged_moves(board, hash_move, ply=3))
+        assert sorted(map(str, staged)) == sorted(map(str, legal_moves))
+        assert len(set(staged)) == len(staged)
+        if hash_move in legal_moves:
+            assert staged[0] == hash_move
+        assert board.fen() == fen
+
+
+@pytest.mark.parametrize("fen,first,last", [
+    # winning capture first, losing capture last
+    ("4k3/8/2p5/3p4/8/8/8/3Q2KR w - - 0 1", None, "d1d5"),
+    ("4k3/8/8/3q4/8/8/8/3R2K1 w - - 0 1", "d1d5", None),
+])
+def test_capture_stages(fen, first, last):
+    staged = list(MoveOrderer().staged_moves(SearchBoard(fen)))
+    if first:
+        assert staged[0].uci() == first
+    if last:
+        assert staged[-1].uci() == last
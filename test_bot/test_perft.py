@@ -0,0 +1,37 @@
+import pytest
+import chess
+from MyEngines.Perft import PERFT_POSITIONS, BOARDS, perft, divide
+
+# Deep enough to cover castling, en passant, promotions and checks, shallow enough to run on every test
+MAX_TEST_NODES = 100000
+
+
+def perft_cases():
+    for name, fen, chess960, expected in PERFT_POSITIONS:
+        for depth, nodes in sorted(expected.items()):
+            if nodes <= MAX_TEST_NODES:
+                for board_name in BOARDS:
+                    yield pytest.param(board_name, fen, chess960, depth, nodes, id=f"{name}-{depth}-{board_name}")
+
+
+@pytest.mark.parametrize("board_name,fen,chess960,depth,nodes", list(perft_cases()))
+def test_perft(board_name, fen, chess960, depth, nodes):
+    board = BOARDS[board_name](fen, chess960=chess960)
+    start_fen = board.fen()
+    assert perft(board, depth) == nodes
+    assert board.fen() == start_fen
+
+
+@pytest.mark.parametrize("board_name", list(BOARDS))
+def test_perft_without_bulk_counting(board_name):
+    name, fen, chess960, expected = PERFT_POSITIONS[1]
+    assert perft(BOARDS[board_name](fen, chess960=chess960), 2, bulk=False) == expected[2]
+
+
+@pytest.mark.parametrize("board_name", list(BOARDS))
+def test_divide(board_name):
+    name, fen, chess960, expected = PERFT_POSITIONS[0]
+    counts = divide(BOARDS[board_name](fen, chess960=chess960), 3)
+    assert len(counts) == expected[1]
+    assert sum(counts.values()) == expected[3]
+    assert counts["e2e4"] == perft(chess.Board("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1"), 2)
@@ -0,0 +1,49 @@
+import os
+import pstats
+import chess
+import chess.engine
+from engine_wrapper import create_engine
+from profiling import GameProfiler
+
+SCORE_ENGINE = {"engine": {"dir": "", "name": "ScoreEngine", "protocol": "homemade", "homemade_options": {"Hash": 1}}}
+
+
+def play_searches(profiler, searches):
+    engine = create_engine(SCORE_ENGINE)
+    profiler.wrap_engine(engine)
+    board = chess.Board()
+    for _ in range(searches):
+        profiler.start_iteration()
+        result = engine.search(board, chess.engine.Limit(depth=2), False, False)
+        profiler.stop_iteration()
+        board.push(result.move)
+    profiler.finish(engine)
+    engine.quit()
+
+
+def test_cprofile(tmp_path):
+    profiler = GameProfiler({"enabled": True, "searches": 2, "directory": str(tmp_path)}, "game1")
+    play_searches(profiler, 3)
+    stats = pstats.Stats(str(tmp_path / "game1" / "search.pstats"))
+    calls = {function[2]: stat[1] for function, stat in stats.stats.items()}
+    # only the first two searches are profiled
+    assert calls["iterative_deepening"] == 2
+
+
+def test_sampling_and_memory(tmp_path):
+    profiler = GameProfiler({"enabled": True, "profiler": "sampling", "searches": 0, "iterations": 1,
+                             "sample_interval": 0.001, "tracemalloc": True, "directory": str(tmp_path)}, "game2")
+    play_searches(profiler, 2)
+    directory = tmp_path / "game2"
+    assert sorted(os.listdir(directory)) == ["loop.collapsed", "memory.snapshot", "memory.txt"]
+    for line in (directory / "loop.collapsed").read_text().splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0
+        assert stack.startswith("MainThread;")
+    assert "transposition_table: " in (directory / "memory.txt").read_text()
+
+
+def test_disabled(tmp_path):
+    profiler = GameProfiler({"directory": str(tmp_path)}, "game3")
+    play_searches(profiler, 1)
+    assert not os.listdir(tmp_path)
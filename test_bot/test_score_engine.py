@@ -0,0 +1,114 @@
+import chess
+import chess.engine
+import chess.polyglot
+import pytest
+from MyEngines.LazySMP import HelperPool
+from MyEngines.ScoreEngine import MATE_SCORE, ScoreEngine
+from MyEngines.SearchBoard import SearchBoard
+from MyEngines.SearchClock import SearchClock
+
+
+def play_into_ponderhit(engine, **limits):
+    board = chess.Board()
+    move = engine.play(board, None, True, **limits)
+    board.push(move)
+    assert engine.ponder_thread is not None
+    board.push(engine.ponder_moves[-1])
+    return board
+
+
+def test_ponderhit_with_depth_limit():
+    engine = ScoreEngine(hash_size=1)
+    board = play_into_ponderhit(engine, max_depth=2)
+    try:
+        move = engine.play(board, None, False, max_depth=2)
+    finally:
+        engine.quit()
+    assert move in board.legal_moves
+    assert engine.clock.depth >= 2
+
+
+def test_ponderhit_with_node_limit():
+    engine = ScoreEngine(hash_size=1)
+    board = play_into_ponderhit(engine, max_nodes=2000)
+    try:
+        move = engine.play(board, None, False, max_nodes=2000)
+    finally:
+        engine.quit()
+    assert move in board.legal_moves
+    assert engine.clock.nodes < 2000 + engine.clock.poll_interval
+
+
+def test_checkmate_beats_the_fifty_move_rule():
+    engine = ScoreEngine(hash_size=1)
+    # Ra8 mates on the move that reaches the fifty-move limit
+    board = SearchBoard("6k1/8/6K1/8/8/8/8/R7 w - - 99 80")
+    board.push_uci("a1a8")
+    assert board.halfmove_clock == 100
+    assert engine.minimax_score(board, current_depth=1, max_depth=2) == MATE_SCORE - 1
+    engine.quit()
+
+
+def test_fifty_move_rule_is_a_draw():
+    engine = ScoreEngine(hash_size=1)
+    board = SearchBoard("6k1/8/6K1/8/8/8/8/R7 w - - 99 80")
+    board.push_uci("a1a2")
+    assert engine.minimax_score(board, current_depth=1, max_depth=2) == 0
+    engine.quit()
+
+
+def test_mate_distance_across_searches():
+    # Bc5+ Kxc5 Qb6+ Kd5 Qd6#, the second search finds the mate in the table of the first
+    engine = ScoreEngine(hash_size=1)
+    board = chess.Board("r1b1kb1r/pppp1ppp/5q2/4n3/3KP3/2N3PN/PPP4P/R1BQ1B1R b kq - 0 1")
+    try:
+        move = engine.play(board, None, False, max_depth=5)
+        assert engine.info(engine.last_stats, board.turn)["score"].relative == chess.engine.Mate(3)
+        board.push(move)
+        board.push_san("Kxc5")
+        move = engine.play(board, None, False, max_depth=3)
+        assert engine.info(engine.last_stats, board.turn)["score"].relative == chess.engine.Mate(2)
+    finally:
+        engine.quit()
+    assert move == chess.Move.from_uci("f6b6")
+
+
+def test_play_with_tiny_time_limit():
+    engine = ScoreEngine(hash_size=1)
+    board = chess.Board("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1")
+    board.push_uci("e1g1")
+    move_stack = list(board.move_stack)
+    try:
+        move = engine.play(board, 1, False)
+    finally:
+        engine.quit()
+    assert board.move_stack == move_stack
+    assert move in board.legal_moves
+
+
+@pytest.mark.parametrize("max_nodes", [500, 5000, 20000])
+def test_search_aborted_mid_iteration(max_nodes, capsys):
+    engine = ScoreEngine(hash_size=1)
+    board = SearchBoard("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1")
+    board.push_uci("e1g1")
+    move_stack = list(board.move_stack)
+    # polling every node raises SearchTimeout deep inside the tree
+    engine.clock = SearchClock(None, poll_interval=1, max_nodes=max_nodes)
+    try:
+        move, _ = engine.search(board, None)
+    finally:
+        engine.quit()
+    assert "Ran out of time at depth" in capsys.readouterr().out
+    assert board.move_stack == move_stack
+    assert board.zobrist_hash == chess.polyglot.zobrist_hash(board)
+    assert move in board.legal_moves
+    # the move of the last completed iteration
+    assert move == engine.stats.pv[0]
+
+
+def test_warns_when_helpers_cannot_start(monkeypatch, caplog):
+    monkeypatch.setattr(HelperPool, "can_start", staticmethod(lambda: False))
+    engine = ScoreEngine(hash_size=1, threads=4)
+    engine.quit()
+    assert engine.helpers is None
+    assert "MyEngines/ScoreEngine" in caplog.text
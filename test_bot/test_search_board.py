@@ -0,0 +1,97 @@
+import random
+import chess
+import chess.polyglot
+import pytest
+from MyEngines.Evaluation import evaluate
+from MyEngines.Perft import PERFT_POSITIONS
+from MyEngines.SearchBoard import SearchBoard
+
+
+def random_walk(board, rng, plies=120):
+    """
+    Play random moves on board, taking some back and copying it now and then, yields the board after every step
+    """
+    for _ in range(plies):
+        moves = list(board.legal_moves)
+        if not moves:
+            break
+        if board.move_stack and rng.random() < 0.2:
+            board.pop()
+        elif rng.random() < 0.05:
+            board = board.copy()
+        else:
+            board.push(rng.choice(moves))
+        yield board
+
+
+def start_positions():
+    for name, fen, chess960, _ in PERFT_POSITIONS:
+        yield pytest.param(fen, chess960, id=name)
+    for index in [0, 518, 959]:
+        yield pytest.param(chess.Board.from_chess960_pos(index).fen(), True, id=f"chess960-{index}")
+
+
+@pytest.mark.parametrize("fen,chess960", list(start_positions()))
+def test_incremental_zobrist_hash(fen, chess960):
+    rng = random.Random(fen)
+    for _ in range(5):
+        for board in random_walk(SearchBoard(fen, chess960=chess960), rng):
+            assert board.zobrist_hash == chess.polyglot.zobrist_hash(board)
+
+
+@pytest.mark.parametrize("fen,chess960", list(start_positions()))
+def test_incremental_evaluation(fen, chess960):
+    rng = random.Random(fen)
+    for board in random_walk(SearchBoard(fen, chess960=chess960), rng, plies=200):
+        tapered, phase = board.tapered, board.phase
+        board.refresh()
+        assert (board.tapered, board.phase) == (tapered, phase)
+
+
+@pytest.mark.parametrize("fen,chess960", list(start_positions()))
+def test_evaluation_is_symmetric(fen, chess960):
+    board = SearchBoard(fen, chess960=chess960)
+    mirrored = SearchBoard(board.mirror().fen(), chess960=chess960)
+    assert evaluate(board) == evaluate(mirrored)
+
+
+def test_zobrist_hash_after_null_move():
+    board = SearchBoard("rnbqkbnr/ppp1pppp/8/8/3pP3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 3")
+    board.push(chess.Move.null())
+    assert board.zobrist_hash == chess.polyglot.zobrist_hash(board)
+    board.pop()
+    assert board.zobrist_hash == chess.polyglot.zobrist_hash(board)
+
+
+def test_from_board():
+    board = chess.Board()
+    for move in ["e2e4", "c7c5", "e4e5", "d7d5"]:
+        board.push_uci(move)
+    search_board = SearchBoard.from_board(board)
+    assert search_board.move_stack == board.move_stack
+    # the en passant capture exd6 is possible, so polyglot hashes the file
+    assert search_board.zobrist_hash == chess.polyglot.zobrist_hash(board)
+
+
+# few pieces, so random games repeat positions
+@pytest.mark.parametrize("fen", ["4k3/8/8/8/8/8/8/1N2K1N1 w - - 0 1", "r3k3/8/8/8/8/8/8/4K2R w Kq - 0 1",
+                                 "4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 2"])
+def test_is_repeated(fen):
+    rng = random.Random(fen)
+    repetitions = 0
+    for _ in range(10):
+        for board in random_walk(SearchBoard(fen), rng):
+            repeated = board.is_repetition(2)
+            assert board.is_repeated() == repeated
+            repetitions += repeated
+    assert repetitions
+
+
+def test_null_move_ends_repetitions():
+    board = SearchBoard("4k3/8/8/8/8/8/8/4K3 w - - 0 1")
+    for move in ["e1d1", "e8d8", "d1e1", "d8e8"]:
+        board.push_uci(move)
+    assert board.is_repeated()
+    board.push(chess.Move.null())
+    board.push(chess.Move.null())
+    assert not board.is_repeated()
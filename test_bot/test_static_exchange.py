@@ -0,0 +1,29 @@
+import chess
+import pytest
+from MyEngines.StaticExchange import see, see_ge
+
+
+@pytest.mark.parametrize("fen,move,value", [
+    # undefended pawn
+    ("4k3/8/8/3p4/8/8/8/3R2K1 w - - 0 1", "d1d5", 100),
+    # the rook behind the first one wins the exchange
+    ("3rk3/8/8/3p4/8/8/3R4/3R2K1 w - - 0 1", "d2d5", 100),
+    # black has the last rook
+    ("3rk3/3r4/8/3p4/8/8/3R4/3R2K1 w - - 0 1", "d2d5", -400),
+    ("4k3/8/2p5/3p4/8/8/8/3Q2K1 w - - 0 1", "d1d5", -800),
+    # the queen behind the bishop
+    ("4k3/8/8/3p4/4B3/8/8/3Q2K1 w - - 0 1", "e4d5", 100),
+    # the king recaptures, but not on a square the x-rayed rook defends
+    ("8/8/4k3/3p4/8/8/8/3R2K1 w - - 0 1", "d1d5", -400),
+    ("8/8/4k3/3p4/8/8/3R4/3R2K1 w - - 0 1", "d2d5", 100),
+    ("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1", "e5d6", 100),
+    ("4k3/P7/8/8/8/8/8/4K3 w - - 0 1", "a7a8q", 800),
+    # the chessprogramming wiki example, with a knight worth 310
+    ("1k1r3q/1ppn3p/p4b2/4p3/8/P2N2P1/1PP1R1BP/2K1Q3 w - - 0 1", "d3e5", -210),
+])
+def test_see(fen, move, value):
+    board = chess.Board(fen)
+    move = chess.Move.from_uci(move)
+    assert see(board, move) == value
+    assert see_ge(board, move, value)
+    assert not see_ge(board, move, value + 1)
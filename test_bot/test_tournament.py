@@ -0,0 +1,43 @@
+import chess
+import tournament
+
+
+def test_sprt():
+    lower, upper = tournament.sprt_bounds(0.05, 0.05)
+    assert lower < 0 < upper
+    assert tournament.sprt_llr(0, 0, 0, 0, 10) == 0
+    assert tournament.sprt_llr(300, 100, 100, 0, 10) > upper
+    assert tournament.sprt_llr(100, 100, 300, 0, 10) < lower
+    assert lower < tournament.sprt_llr(100, 100, 100, 0, 10) < 0
+    # one sided results still lead to a decision
+    assert tournament.sprt_llr(50, 0, 0, 0, 10) > upper
+
+
+def test_elo_difference():
+    assert tournament.elo_difference(10, 0, 10)[0] == 0
+    elo, margin = tournament.elo_difference(60, 20, 20)
+    assert 140 < elo < 150
+    assert margin > 0
+
+
+def test_play_game():
+    random_move = {"dir": "", "name": "RandomMove", "protocol": "homemade"}
+    first_move = {"dir": "", "name": "FirstMove", "protocol": "homemade"}
+    opening = (chess.STARTING_FEN, ["e2e4", "e7e5"])
+    number, white, black, result, termination, pgn = tournament.play_game(
+        (1, ("Random", random_move), ("First", first_move), opening, {"base": 60, "increment": 0}, 40))
+    assert (number, white, black) == (1, "Random", "First")
+    assert result in ["1-0", "0-1", "1/2-1/2"]
+    assert '[White "Random"]' in pgn
+    assert "1. e4 e5" in pgn
+
+
+def test_standings():
+    standings = tournament.Standings(["a", "b", "c"])
+    standings.add("a", "b", "1-0", "checkmate")
+    standings.add("b", "a", "1/2-1/2", "stalemate")
+    standings.add("c", "a", "0-1", "time forfeit")
+    assert standings.player("a") == [2, 1, 0]
+    assert standings.player("b") == [0, 1, 1]
+    assert standings.games() == 3
+    assert standings.score("a") == 2.5
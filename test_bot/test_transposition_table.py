@@ -0,0 +1,91 @@
+import chess
+import pytest
+from MyEngines.ScoreEngine import MATE_SCORE, mate_distance, score_from_table, score_to_table
+from MyEngines.TranspositionTable import (TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND, MAX_SCORE,
+                                          shared_memory)
+
+
+@pytest.mark.parametrize("bound", [EXACT, LOWER_BOUND, UPPER_BOUND])
+@pytest.mark.parametrize("score", [0, 37, -250, 100000, -100000, MAX_SCORE + 1])
+def test_store_and_probe(bound, score):
+    table = TranspositionTable(1)
+    key = 0x123456789ABCDEF0
+    move = chess.Move.from_uci("e7e8n")
+    table.store(key, 6, bound, score, move)
+    entry = table.probe(key)
+    assert entry.depth == 6
+    assert entry.bound == bound
+    assert entry.score == min(max(score, -MAX_SCORE), MAX_SCORE)
+    assert entry.move == move
+
+
+def test_scores_are_rounded():
+    table = TranspositionTable(1)
+    table.store(3, 1, EXACT, 100000 / 3)
+    table.store(4, 1, EXACT, -41.6)
+    assert table.probe(3).score == 33333
+    assert table.probe(4).score == -42
+
+
+@pytest.mark.parametrize("plies", [3, 5, 8])
+def test_mate_scores_are_stored_relative_to_the_node(plies):
+    table = TranspositionTable(1)
+    # a mate plies after the root, stored at a node 2 plies deep
+    table.store(11, 4, EXACT, score_to_table(MATE_SCORE - plies, 2))
+    table.store(12, 4, EXACT, score_to_table(-(MATE_SCORE - plies), 2))
+    # the same position reached 4 plies deep, and at the root of the next search
+    assert mate_distance(score_from_table(table.probe(11).score, 4)) == plies + 2
+    assert mate_distance(score_from_table(table.probe(12).score, 4)) == plies + 2
+    assert mate_distance(score_from_table(table.probe(11).score, 0)) == plies - 2
+    assert score_from_table(score_to_table(250, 5), 1) == 250
+
+
+def test_probe_misses():
+    table = TranspositionTable(1)
+    table.store(1, 3, EXACT, 10)
+    assert table.probe(2) is None
+    # same bucket, different key
+    assert table.probe(1 + (table.bucket_mask + 1) * 4) is None
+    table.clear()
+    assert table.probe(1) is None
+
+
+def test_store_keeps_the_best_move():
+    table = TranspositionTable(1)
+    move = chess.Move.from_uci("g1f3")
+    table.store(7, 2, LOWER_BOUND, 30, move)
+    table.store(7, 4, UPPER_BOUND, -20)
+    entry = table.probe(7)
+    assert (entry.depth, entry.bound, entry.score, entry.move) == (4, UPPER_BOUND, -20, move)
+
+
+def test_replacement():
+    table = TranspositionTable(1)
+    stride = table.bucket_mask + 1
+    deep, shallow, new = 5, 5 + stride, 5 + 2 * stride
+    table.store(deep, 10, EXACT, 1)
+    table.store(shallow, 2, EXACT, 2)
+    # the bucket is full, the shallowest entry makes room
+    table.store(new, 4, EXACT, 3)
+    assert table.probe(deep) and table.probe(new)
+    assert table.probe(shallow) is None
+
+    # entries from old searches are replaced before deeper ones of this search
+    for _ in range(3):
+        table.new_search()
+    table.store(shallow, 4, EXACT, 2)
+    table.store(shallow + 3 * stride, 1, EXACT, 4)
+    assert table.probe(deep) is None
+    assert table.probe(shallow) and table.probe(shallow + 3 * stride)
+
+
+@pytest.mark.skipif(shared_memory is None, reason="shared memory needs Python 3.8")
+def test_shared_table():
+    table = TranspositionTable(1, shared=True)
+    attached = TranspositionTable(1, name=table.name)
+    try:
+        table.store(99, 5, LOWER_BOUND, 120, chess.Move.from_uci("e2e4"))
+        assert attached.probe(99) == table.probe(99)
+    finally:
+        attached.close()
+        table.close(unlink=True)
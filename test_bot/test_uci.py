@@ -0,0 +1,87 @@
+import io
+import os
+import sys
+import threading
+import time
+import chess
+import chess.engine
+from MyEngines.UCI import UCI
+
+LAUNCHER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "MyEngines", "ScoreEngine")
+
+
+def test_play_through_python_chess():
+    engine = chess.engine.SimpleEngine.popen_uci([sys.executable, LAUNCHER])
+    try:
+        assert engine.id["name"] == "ScoreEngine"
+        assert {"Hash", "Threads", "NullMove"} <= set(engine.options)
+        engine.configure({"Hash": 1})
+
+        board = chess.Board("r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5Q2/PPPP1PPP/RNB1K1NR w KQkq - 4 4")
+        info = engine.analyse(board, chess.engine.Limit(depth=3))
+        assert info["depth"] == 3
+        assert info["pv"][0] == chess.Move.from_uci("f3f7")
+        assert info["score"].relative.mate() == 1
+
+        for limit in [chess.engine.Limit(nodes=500), chess.engine.Limit(time=0.2),
+                      chess.engine.Limit(white_clock=5, black_clock=5)]:
+            result = engine.play(board, limit)
+            assert result.move in board.legal_moves
+    finally:
+        engine.quit()
+
+
+def read_bestmove(output, timeout=30):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        lines = [line for line in output.getvalue().splitlines() if line.startswith("bestmove")]
+        if lines:
+            return lines
+        time.sleep(0.01)
+    return []
+
+
+def test_ponderhit_and_stop():
+    output = io.StringIO()
+    uci = UCI(output)
+    uci.handle("setoption name Hash value 1")
+    uci.handle("position startpos moves e2e4")
+
+    # a ponder search only answers after ponderhit
+    uci.handle("go ponder depth 2")
+    time.sleep(0.2)
+    assert not read_bestmove(output, timeout=0)
+    uci.handle("ponderhit")
+    assert len(read_bestmove(output)) == 1
+
+    # an infinite search answers on stop
+    uci.handle("go infinite")
+    time.sleep(0.2)
+    uci.handle("stop")
+    bestmoves = read_bestmove(output)
+    assert len(bestmoves) == 2
+    assert chess.Move.from_uci(bestmoves[-1].split()[1]) in chess.Board("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/"
+                                                                        "RNBQKBNR b KQkq - 0 1").legal_moves
+    uci.run(["quit"])
+
+
+class SlowOutput(io.StringIO):
+    """
+    Gives the other threads a chance to write in the middle of every write
+    """
+    def write(self, text):
+        time.sleep(0.001)
+        return super().write(text)
+
+
+def test_send_from_several_threads():
+    output = SlowOutput()
+    uci = UCI(output)
+    threads = [threading.Thread(target=lambda index=index: [uci.send(f"info string {index}") for _ in range(20)])
+               for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    lines = output.getvalue().splitlines()
+    assert sorted(lines) == sorted(f"info string {index}" for index in range(4) for _ in range(20))
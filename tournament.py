@@ -0,0 +1,342 @@
+import argparse
+import datetime
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+import chess
+import chess.pgn
+import chess.polyglot
+import yaml
+from engine_wrapper import create_engine
+from epd_runner import init_worker
+
+# Games that get this long without a result are adjudicated as draws
+DEFAULT_MAX_PLIES = 400
+
+
+def sprt_bounds(alpha, beta):
+    """
+    Lower and upper bound of the log likelihood ratio, the test stops once the LLR leaves them
+    """
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+
+def expected_score(elo):
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def sprt_llr(wins, draws, losses, elo0, elo1):
+    """
+    Log likelihood ratio of elo1 against elo0 for the first player, with the normal approximation of the
+    trinomial distribution of the game results
+    """
+    if not wins + draws + losses:
+        return 0.0
+    # half a game of each result keeps the variance above zero in one sided matches
+    if not wins or not draws or not losses:
+        wins, draws, losses = wins + 0.5, draws + 0.5, losses + 0.5
+    games = wins + draws + losses
+    score = (wins + draws / 2) / games
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    score0, score1 = expected_score(elo0), expected_score(elo1)
+    return games * (score1 - score0) * (2 * score - score0 - score1) / (2 * variance)
+
+
+def elo_difference(wins, draws, losses):
+    """
+    Elo difference and its 95% error margin from the results of the first player
+    """
+    games = wins + draws + losses
+    if not games:
+        return 0.0, 0.0
+    score = (wins + draws / 2) / games
+    if score <= 0 or score >= 1:
+        return (math.inf if score >= 1 else -math.inf), math.inf
+
+    def elo(score):
+        return -400 * math.log10(1 / score - 1)
+
+    deviation = math.sqrt((wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games)
+    margin = 1.96 * deviation / math.sqrt(games)
+    low, high = max(score - margin, 1e-6), min(score + margin, 1 - 1e-6)
+    return elo(score), (elo(high) - elo(low)) / 2
+
+
+def book_openings(path, plies, count, rng):
+    """
+    count openings of plies moves, walked from the start position with weighted random book moves
+    """
+    openings = []
+    with chess.polyglot.open_reader(path) as reader:
+        for _ in range(count):
+            board = chess.Board()
+            for _ in range(plies):
+                try:
+                    entry = reader.weighted_choice(board, random=rng)
+                except IndexError:
+                    break
+                board.push(entry.move)
+            openings.append((chess.STARTING_FEN, [move.uci() for move in board.move_stack]))
+    return openings
+
+
+def file_openings(path, plies):
+    """
+    The positions of an EPD file, or the first plies moves of every game of a PGN file
+    """
+    openings = []
+    if path.endswith(".epd"):
+        with open(path) as epd_file:
+            for line in epd_file:
+                if line.strip():
+                    board, _ = chess.Board.from_epd(line)
+                    openings.append((board.fen(), []))
+        return openings
+
+    with open(path, encoding="latin-1") as pgn:
+        while True:
+            game = chess.pgn.read_game(pgn)
+            if game is None:
+                break
+            moves = [move.uci() for move in itertools.islice(game.mainline_moves(), plies)]
+            openings.append((game.board().fen(), moves))
+    return openings
+
+
+def load_openings(opening_cfg, count, rng):
+    """
+    count openings from the book or file of the openings section, the start position without one
+    """
+    path = opening_cfg.get("book") or opening_cfg.get("file")
+    plies = opening_cfg.get("plies", 8)
+    if not path:
+        return [(chess.STARTING_FEN, [])] * count
+    if path.endswith(".bin"):
+        return book_openings(path, plies, count, rng)
+
+    openings = file_openings(path, plies)
+    if not openings:
+        raise ValueError(f"No openings in {path}.")
+    rng.shuffle(openings)
+    return list(itertools.islice(itertools.cycle(openings), count))
+
+
+def play_game(task):
+    """
+    Play one game under the clock rules of lichess-bot: each engine gets both clocks and the increments,
+    the time it used comes off its clock and the increment is added after its move.
+    Returns (game number, white, black, result, termination, PGN).
+    """
+    number, (white, white_cfg), (black, black_cfg), (fen, opening), time_control, max_plies = task
+    base, increment = time_control["base"], time_control.get("increment", 0)
+
+    board = chess.Board(fen)
+    for move in opening:
+        board.push_uci(move)
+
+    engines = {}
+    try:
+        engines[chess.WHITE] = create_engine({"engine": white_cfg})
+        engines[chess.BLACK] = create_engine({"engine": black_cfg})
+        clocks = {chess.WHITE: base, chess.BLACK: base}
+        result, termination = None, None
+
+        while result is None:
+            outcome = board.outcome(claim_draw=True)
+            if outcome:
+                result, termination = outcome.result(), outcome.termination.name.lower()
+                break
+            if len(board.move_stack) - len(opening) >= max_plies:
+                result, termination = "1/2-1/2", "adjudication"
+                break
+
+            turn = board.turn
+            start = time.perf_counter()
+            play_result = engines[turn].search_with_ponder(board.copy(), clocks[chess.WHITE] * 1000,
+                                                           clocks[chess.BLACK] * 1000, increment * 1000,
+                                                           increment * 1000, False, False)
+            clocks[turn] -= time.perf_counter() - start
+
+            loss = "0-1" if turn == chess.WHITE else "1-0"
+            if clocks[turn] < 0:
+                # a flag only loses when the opponent could still mate
+                result = "1/2-1/2" if board.has_insufficient_material(not turn) else loss
+                termination = "time forfeit"
+            elif play_result.resigned:
+                result, termination = loss, "resignation"
+            elif play_result.move is None or play_result.move not in board.legal_moves:
+                result, termination = loss, "illegal move"
+            else:
+                clocks[turn] += increment
+                board.push(play_result.move)
+    finally:
+        for engine in engines.values():
+            engine.quit()
+
+    game = chess.pgn.Game.from_board(board)
+    game.headers["Event"] = "Local tournament"
+    game.headers["Site"] = "?"
+    game.headers["Date"] = datetime.date.today().strftime("%Y.%m.%d")
+    game.headers["Round"] = str(number)
+    game.headers["White"] = white
+    game.headers["Black"] = black
+    game.headers["Result"] = result
+    game.headers["TimeControl"] = f"{base}+{increment}"
+    game.headers["Termination"] = termination
+    return number, white, black, result, termination, str(game)
+
+
+def schedule(players, openings, time_control, max_plies):
+    """
+    Every opening is played by every pair of players, once with each color
+    """
+    tasks = []
+    for opening in openings:
+        for first, second in itertools.combinations(players.items(), 2):
+            for white, black in [(first, second), (second, first)]:
+                tasks.append((len(tasks) + 1, white, black, opening, time_control, max_plies))
+    return tasks
+
+
+class Standings:
+    """
+    Results of the tournament so far, as wins, draws and losses of each player against each other player
+    """
+    def __init__(self, names):
+        self.names = names
+        self.results = {(player, opponent): [0, 0, 0] for player in names for opponent in names if player != opponent}
+        self.terminations = {}
+
+    def add(self, white, black, result, termination):
+        index = {"1-0": 0, "1/2-1/2": 1, "0-1": 2}[result]
+        self.results[(white, black)][index] += 1
+        self.results[(black, white)][2 - index] += 1
+        self.terminations[termination] = self.terminations.get(termination, 0) + 1
+
+    def player(self, name):
+        """
+        Wins, draws and losses of name against everyone
+        """
+        return [sum(self.results[(name, opponent)][index] for opponent in self.names if opponent != name)
+                for index in range(3)]
+
+    def games(self):
+        return sum(sum(self.player(name)) for name in self.names) // 2
+
+    def summary(self, sprt=None):
+        lines = []
+        for name in sorted(self.names, key=lambda name: -self.score(name)):
+            wins, draws, losses = self.player(name)
+            lines.append(f"{name:<24} +{wins} ={draws} -{losses}  {self.score(name):g}/{wins + draws + losses}")
+        if len(self.names) == 2:
+            wins, draws, losses = self.player(self.names[0])
+            elo, margin = elo_difference(wins, draws, losses)
+            lines.append(f"{self.names[0]} - {self.names[1]}: elo {elo:+.1f} +/- {margin:.1f}")
+            if sprt:
+                lower, upper = sprt_bounds(sprt["alpha"], sprt["beta"])
+                lines.append(f"SPRT [{sprt['elo0']}, {sprt['elo1']}]: llr {self.llr(sprt):.2f} "
+                             f"({lower:.2f}, {upper:.2f})")
+        lines.append("Terminations: " + ", ".join(f"{termination} {count}"
+                                                  for termination, count in sorted(self.terminations.items())))
+        return lines
+
+    def score(self, name):
+        wins, draws, _ = self.player(name)
+        return wins + draws / 2
+
+    def llr(self, sprt):
+        wins, draws, losses = self.player(self.names[0])
+        return sprt_llr(wins, draws, losses, sprt["elo0"], sprt["elo1"])
+
+    def sprt_decision(self, sprt):
+        """
+        "H1" when the first player is elo1 stronger, "H0" when it is not, None while the test goes on
+        """
+        lower, upper = sprt_bounds(sprt["alpha"], sprt["beta"])
+        llr = self.llr(sprt)
+        if llr >= upper:
+            return "H1"
+        if llr <= lower:
+            return "H0"
+        return None
+
+
+def run(tournament_cfg, output=sys.stdout):
+    """
+    Play the tournament of a tournament config, returns the standings and the SPRT decision if there is one
+    """
+    players = {}
+    for name, engine_cfg in tournament_cfg["players"].items():
+        engine_cfg = dict(engine_cfg)
+        engine_cfg.setdefault("dir", "")
+        players[name] = engine_cfg
+    if len(players) < 2:
+        raise ValueError("A tournament needs at least two players.")
+
+    rng = random.Random(tournament_cfg.get("seed"))
+    pairs = len(players) * (len(players) - 1) // 2
+    # every opening gives each pair two games
+    opening_count = max(math.ceil(tournament_cfg.get("games", 100) / (2 * pairs)), 1)
+    openings = load_openings(tournament_cfg.get("openings") or {}, opening_count, rng)
+    tasks = schedule(players, openings, tournament_cfg["time_control"],
+                     tournament_cfg.get("max_plies", DEFAULT_MAX_PLIES))
+
+    sprt = tournament_cfg.get("sprt") if len(players) == 2 else None
+    standings = Standings(list(players))
+    decision = None
+
+    pgn_path = tournament_cfg.get("pgn", "tournament.pgn")
+    with open(pgn_path, "w") as pgn, multiprocessing.Pool(tournament_cfg.get("concurrency"),
+                                                          initializer=init_worker) as pool:
+        for number, white, black, result, termination, game in pool.imap_unordered(play_game, tasks):
+            print(game, file=pgn, end="\n\n", flush=True)
+            standings.add(white, black, result, termination)
+            print(f"Game {number}: {white} - {black} {result} ({termination}), "
+                  f"{standings.games()}/{len(tasks)} played", file=output)
+            if sprt:
+                decision = standings.sprt_decision(sprt)
+                if decision:
+                    print(f"SPRT accepted {decision} after {standings.games()} games", file=output)
+                    # the Pool context terminates the games still running
+                    break
+
+    for line in standings.summary(sprt):
+        print(line, file=output)
+
+    summary_path = tournament_cfg.get("summary") or os.path.splitext(pgn_path)[0] + ".json"
+    with open(summary_path, "w") as summary:
+        json.dump({"games": standings.games(),
+                   "players": {name: dict(zip(["wins", "draws", "losses"], standings.player(name)))
+                               for name in standings.names},
+                   "terminations": standings.terminations,
+                   "sprt": dict(sprt, llr=standings.llr(sprt), decision=decision) if sprt else None},
+                  summary, indent=2)
+    return standings, decision
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play a local tournament between engines.")
+    parser.add_argument("--config", default="./tournament.yml",
+                        help="Tournament file with the players, time control and openings "
+                             "(defaults to ./tournament.yml).")
+    parser.add_argument("--games", type=int, help="Number of games, overrides the tournament file.")
+    parser.add_argument("--concurrency", type=int, help="Number of games played at once.")
+    parser.add_argument("--pgn", help="File the games are written to.")
+    args = parser.parse_args()
+
+    with open(args.config) as stream:
+        tournament_cfg = yaml.safe_load(stream)
+    for key in ["games", "concurrency", "pgn"]:
+        if getattr(args, key) is not None:
+            tournament_cfg[key] = getattr(args, key)
+
+    run(tournament_cfg)
+
+
+if __name__ == "__main__":
+    main()